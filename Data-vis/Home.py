@@ -1,5 +1,12 @@
+import os
+import sys
+
+import pandas as pd
 import streamlit as st
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from fpl_data import load_live_feed, load_table
+
 # Project Description
 st.title("Fantasy Premier League Analysis and Insights ")
 st.markdown("""
@@ -14,3 +21,25 @@ This application provides a detailed analysis of Fantasy Premier League (FPL) da
 
 This tool leverages various FPL datasets to generate interactive visualizations, making it easier to analyze performance and optimize your fantasy football strategy.
 """)
+
+# Live gameweek: the change feed of FPL/Live.py, re-read every 30 seconds without rerunning the page
+def describe_change(event):
+    if event['type'] == 'new':
+        return f"kicked off, {event['values'].get('total_points', 0)} pts"
+    return ', '.join(f"{column} {old} → {new}" for column, (old, new) in event['changes'].items())
+
+@st.fragment(run_every=30)
+def live_updates():
+    feed = load_live_feed()
+    if feed.empty:
+        return
+    st.subheader(f"Live updates: GW{feed['GW'].iloc[-1]}")
+    names = load_table('Players', ['id', 'web_name']).set_index('id')['web_name']
+    latest = feed.tail(50).iloc[::-1]
+    st.dataframe(pd.DataFrame({
+        'time': pd.to_datetime(latest['time']).dt.tz_convert('Europe/London').dt.strftime('%H:%M'),
+        'player': latest['element'].map(names).astype(str),
+        'change': [describe_change(event) for event in latest.to_dict('records')],
+    }), hide_index=True)
+
+live_updates()
@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+
+# Shared data access for the dashboard pages. Tables are read once per data version
+# (the latest modification time in the data folder) instead of on every rerun.
+# Modules only some pages need (Live, Optimizer, pulp) are imported where they are used,
+# so they do not slow down the first paint of the other pages.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get('FPL_DASHBOARD_DATA', os.path.join(ROOT_DIR, 'data'))
+
+sys.path.append(os.path.join(ROOT_DIR, 'FPL'))
+from Storage import read_table
+from Search import PlayerIndex
+from Views import build_views, read_views
+
+######################################################
+# data version
+######################################################
+def data_version():
+    """
+    Function that returns the newest mtime (ns) of the files in the data folder.
+    It changes whenever the pipeline writes new data, which invalidates the caches below.
+    """
+    latest = 0
+    for folder in (DATA_DIR, os.path.join(DATA_DIR, 'parquet')):
+        if not os.path.isdir(folder):
+            continue
+        for entry in os.scandir(folder):
+            latest = max(latest, entry.stat().st_mtime_ns)
+    return latest
+
+######################################################
+# raw tables
+######################################################
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _load_table(name, columns, version):
+    return read_table(name, columns=list(columns) if columns else None, data_dir=DATA_DIR)
+
+def load_table(name, columns=None):
+    """
+    Function that returns a table (optionally only some columns) from the shared cache.
+    The frame is shared between sessions: filter or copy it, never modify it in place.
+    """
+    return _load_table(name, tuple(columns) if columns else None, data_version())
+
+######################################################
+# precomputed views
+######################################################
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _player_index(version):
+    return PlayerIndex(_load_table('Players', None, version))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _views(version):
+    # Pre-rendered by the pipeline (see FPL/Views.py), rendered here when the data folder has none
+    views = read_views(os.path.join(DATA_DIR, 'views'))
+    if views is None:
+        views = build_views(_load_table('Fixtures', None, version), _load_table('Teams', None, version))
+    return views
+
+def load_views():
+    """
+    Pre-rendered fixture lists and FDR tables ({file name: content}, see FPL/Views.py).
+    """
+    return _views(data_version())
+
+def load_player_index():
+    """
+    Player search index (name prefix/trigram search, id <-> code maps, price ranges).
+    """
+    return _player_index(data_version())
+
+######################################################
+# live gameweek
+######################################################
+def load_live_feed(gameweek=None, since=0):
+    """
+    Change feed of the live updater (FPL/Live.py) for gameweek (default: the latest), oldest first.
+    Not cached: the file is small and grows during the gameweek.
+    """
+    if not os.path.isdir(os.path.join(DATA_DIR, 'live')):
+        return pd.DataFrame()
+    from Live import read_feed
+    return read_feed(gameweek, since, data_dir=DATA_DIR)
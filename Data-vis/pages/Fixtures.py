@@ -1,7 +1,11 @@
-import pandas as pd
-from datetime import datetime, timezone
+import json
 import streamlit as st
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fpl_data import load_views
+from Views import FDR_COLORS, FDR_NAMES
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -78,28 +82,10 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# --- Data Loading and Preprocessing ---
-# Get the absolute path for the data directory
-data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
-
-# Load DataFrames
-df_teams = pd.read_csv(os.path.join(data_dir, "Teams.csv"))
-df_fixtures = pd.read_csv(os.path.join(data_dir, "Fixtures.csv"))
-
-# --- Data Preprocessing (Including Fixtures) ---
-team_name_mapping = pd.Series(df_teams.team_name.values, index=df_teams.id).to_dict()
-team_short_name_mapping = pd.Series(df_teams.short_name.values, index=df_teams.id).to_dict()
-df_fixtures['team_a'] = df_fixtures['team_a'].replace(team_name_mapping)
-df_fixtures['team_h'] = df_fixtures['team_h'].replace(team_name_mapping)
-df_fixtures['team_a_short'] = df_fixtures['team_a'].map(lambda x: team_short_name_mapping[df_teams[df_teams.team_name == x].id.values[0]] if x in team_name_mapping.values() else None)
-df_fixtures['team_h_short'] = df_fixtures['team_h'].map(lambda x: team_short_name_mapping[df_teams[df_teams.team_name == x].id.values[0]] if x in team_name_mapping.values() else None)
-df_fixtures = df_fixtures.drop(columns=['pulse_id'])
-
-# Add datetime columns
-df_fixtures['datetime'] = pd.to_datetime(df_fixtures['kickoff_time'], utc=True)
-df_fixtures['local_time'] = df_fixtures['datetime'].dt.tz_convert('Europe/London').dt.strftime('%A %d %B %Y %H:%M')
-df_fixtures['local_date'] = df_fixtures['datetime'].dt.tz_convert('Europe/London').dt.strftime('%A %d %B %Y')
-df_fixtures['local_hour'] = df_fixtures['datetime'].dt.tz_convert('Europe/London').dt.strftime('%H:%M')
+# --- Data Loading ---
+# Fixture lists and FDR tables pre-rendered by the pipeline (FPL/Views.py), served as they are
+views = load_views()
+manifest = json.loads(views['manifest.json'])
 
 # --- Streamlit App ---
 st.title('Fantasy Premier League: Fixtures & FDR')
@@ -113,15 +99,11 @@ with st.sidebar:
     )
 
     # --- Dynamic Gameweek Selection ---
-    min_gameweek = int(df_fixtures['event'].min())
-    max_gameweek = int(df_fixtures['event'].max())
+    min_gameweek = manifest['first_gameweek']
+    max_gameweek = manifest['last_gameweek']
 
     # Get the next unfinished gameweek
-    next_unfinished_gameweek = next(
-        (gw for gw in range(min_gameweek, max_gameweek + 1) if
-         df_fixtures[(df_fixtures['event'] == gw) & (df_fixtures['finished'] == False)].shape[0] > 0),
-        min_gameweek
-    )
+    next_unfinished_gameweek = manifest['next_gameweek']
 
     if selected_display == "Premier League Fixtures":
         # --- Gameweek Selection (moved under Navigation)---
@@ -143,72 +125,14 @@ if selected_display == 'Premier League Fixtures':
         unsafe_allow_html=True,
     )
 
-    current_gameweek_fixtures = df_fixtures[df_fixtures['event'] == selected_gameweek]
-    grouped_fixtures = current_gameweek_fixtures.groupby('local_date')
-
-    # Use centered container for fixtures
-    with st.container():
-        for date, matches in grouped_fixtures:
-            st.markdown(f"<h3 style='text-align: center;'>{date}</h3>", unsafe_allow_html=True)
-            for _, match in matches.iterrows():
-                # Create a fixture box for each match
-                with st.container():
-                    col1, col2, col3 = st.columns([4, 1, 4])  # Adjust column proportions
-
-                    with col1:
-                        st.markdown(f"**{match['team_h']}**", unsafe_allow_html=True)
-                    with col2:
-                        if match['finished']:
-                            st.markdown(
-                                f"<p class='score'>{int(match['team_h_score'])} - {int(match['team_a_score'])}</p>",
-                                unsafe_allow_html=True
-                            )
-                        else:
-                            st.markdown(f"<p style='text-align: center;'>vs</p>", unsafe_allow_html=True)
-                    with col3:
-                        st.markdown(f"**{match['team_a']}**", unsafe_allow_html=True)
-
-                    if not match['finished']:
-                        st.markdown(f"<p class='kickoff'>Kickoff: {match['local_hour']}</p>",
-                                    unsafe_allow_html=True)
+    fixture_list = views.get(f'fixtures_GW{selected_gameweek}.html')
+    if fixture_list is None:
+        st.write("No fixtures in this gameweek.")
+    else:
+        st.markdown(fixture_list, unsafe_allow_html=True)
 
 ################# --- FDR Matrix Display ---
 elif selected_display == "Fixture Difficulty Rating":
-    # --- FDR Matrix Calculation ---
-    upcoming_gameweeks = df_fixtures[df_fixtures['finished'] == False]
-    teams = upcoming_gameweeks['team_a_short'].unique()
-    unique_gameweeks = upcoming_gameweeks['event'].unique()
-    formatted_gameweeks = [f'GW{gw}' for gw in unique_gameweeks]
-    fdr_matrix = pd.DataFrame(index=teams, columns=formatted_gameweeks)
-    fdr_values = {}
-
-    for index, row in upcoming_gameweeks.iterrows():
-        gameweek = f'GW{row["event"]}'
-        team_a = row['team_a_short']
-        team_h = row['team_h_short']
-        fdr_a = row['team_a_difficulty']
-        fdr_h = row['team_h_difficulty']
-
-        fdr_matrix.at[team_a, gameweek] = f"{team_h} (A)"
-        fdr_matrix.at[team_h, gameweek] = f"{team_a} (H)"
-        fdr_values[(team_a, gameweek)] = fdr_a
-        fdr_values[(team_h, gameweek)] = fdr_h
-
-    fdr_matrix = fdr_matrix.astype(str)
-
-    # --- Color Coding Function ---
-    def color_fdr(team, gameweek):
-        fdr_value = fdr_values.get((team, gameweek), None)
-        colors = {
-            1: ('#257d5a', 'black'),
-            2: ('#00ff86', 'black'),
-            3: ('#ebebe4', 'black'),
-            4: ('#ff005a', 'white'),
-            5: ('#861d46', 'white'),
-        }
-        bg_color, font_color = colors.get(fdr_value, ('white', 'black'))
-        return f'background-color: {bg_color}; color: {font_color};'
-
     # Slider for FDR starting from the upcoming gameweek
     selected_gameweek = st.sidebar.slider(
         "Select Gameweek:",
@@ -217,33 +141,19 @@ elif selected_display == "Fixture Difficulty Rating":
         value=next_unfinished_gameweek
     )
 
-    # --- Filter FDR Table for Next 10 Gameweeks ---
-    filtered_fdr_matrix = fdr_matrix.copy()
-    filtered_fdr_matrix = filtered_fdr_matrix[
-        [f'GW{gw}' for gw in range(selected_gameweek, selected_gameweek + 10) if f'GW{gw}' in
-         filtered_fdr_matrix.columns]]
-
+    # --- FDR Table for the Next 10 Gameweeks (coloured by difficulty when rendered) ---
     st.markdown(
-        f"**Fixture Difficulty Rating (FDR) for the Next 10 Gameweeks (Starting GW{selected_gameweek})**",
+        f"**Fixture Difficulty Rating (FDR) for the Next {manifest['fdr_horizon']} Gameweeks (Starting GW{selected_gameweek})**",
         unsafe_allow_html=True)
-    styled_filtered_fdr_table = filtered_fdr_matrix.style.apply(
-        lambda row: [color_fdr(row.name, col) for col in row.index], axis=1)
-    st.write(styled_filtered_fdr_table)
+    st.markdown(views[f'fdr_GW{selected_gameweek}.html'], unsafe_allow_html=True)
 
     # --- FDR Legend ---
     with st.sidebar:
         st.markdown("**Legend:**")
-        fdr_colors = {
-            1: ("#257d5a", "black"),
-            2: ("#00ff86", "black"),
-            3: ("#ebebe4", "black"),
-            4: ("#ff005a", "white"),
-            5: ("#861d46", "white"),
-        }
-        for fdr, (bg_color, font_color) in fdr_colors.items():
+        for fdr, (bg_color, font_color) in FDR_COLORS.items():
             st.sidebar.markdown(
                 f"<span style='background-color: {bg_color}; color: {font_color}; padding: 2px 5px; border-radius: 3px;'>"
-                f"{fdr} - {'Very Easy' if fdr == 1 else 'Easy' if fdr == 2 else 'Medium' if fdr == 3 else 'Difficult' if fdr == 4 else 'Very Difficult'}"
+                f"{fdr} - {FDR_NAMES[fdr]}"
                 f"</span>",
                 unsafe_allow_html=True,
             )
\ No newline at end of file
@@ -1,31 +1,74 @@
 import streamlit as st
-import pandas as pd
+import math
 import os
+import sys
 
-data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
-# Load your FPL data
-df_teams = pd.read_csv(os.path.join(data_dir, "Teams.csv"))
-df_fixtures = pd.read_csv(os.path.join(data_dir, "Fixtures.csv"))
-df_fact_player = pd.read_csv(os.path.join(data_dir, "Fact_Player.csv"))
-df_gameweeks = pd.read_csv(os.path.join(data_dir, "Gameweeks.csv"))
-df_player_history = pd.read_csv(os.path.join(data_dir, "Player_history.csv"))
-df_players = pd.read_csv(os.path.join(data_dir, "Players.csv"))
-df_positions = pd.read_csv(os.path.join(data_dir, "Positions.csv"))
-
-# Function to filter players based on selected metrics
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fpl_data import load_player_index, load_table
+from Projection import RATE_COLUMNS, project_points
+
+# Load your FPL data (cached once per data version), only the columns the search, the
+# projection and the optimizer read. Players is shared whole with the player index.
+df_teams = load_table("Teams", ['id', 'team_name', 'strength_attack_home', 'strength_attack_away',
+                                'strength_defence_home', 'strength_defence_away'])
+df_fixtures = load_table("Fixtures", ['event', 'finished', 'team_h', 'team_a', 'team_h_difficulty', 'team_a_difficulty'])
+df_fact_player = load_table("Fact_Player", ['element', 'GW', 'minutes_played', 'total_points', 'bps', *RATE_COLUMNS])
+df_players = load_table("Players")
+df_positions = load_table("Positions", ['id', 'singular_name', 'squad_select', 'squad_min_play', 'squad_max_play'])
+
+# Function to build the optimal squad based on selected metrics
 def filter_players(players_df, metrics):
-    # Implement your filtering logic here based on selected metrics
-    return players_df  # Placeholder return
+    # Imported on first use: the ILP solver is only needed once Build is pressed
+    from Optimizer import build_squad
+    return build_squad(
+        players_df, df_positions, metrics,
+        budget=budget,
+        max_per_club=max_players,
+        include_injured=include_injured,
+        position_metrics=position_metrics,
+        fact_df=df_fact_player,
+        fixtures_df=df_fixtures,
+        gameweek=gameweek,
+    )
 
 # Streamlit layout
 st.title("Fantasy Premier League Player Selection Tool")
 
+# Player search: answered from the index, no scan of the players table per widget change
+player_index = load_player_index()
+with st.expander("Find players"):
+    search_query = st.text_input("Name")
+    position_names = dict(zip(df_positions['id'], df_positions['singular_name']))
+    team_names = dict(zip(df_teams['id'], df_teams['team_name']))
+    search_position = st.selectbox("Position", [None, *position_names], format_func=lambda i: position_names.get(i, 'All'))
+    search_team = st.selectbox("Team", [None, *team_names], format_func=lambda i: team_names.get(i, 'All'))
+    # Bounds on the 0.1 grid around the cheapest and most expensive player
+    price_range = (math.floor(df_players['now_cost'].min() * 10) / 10, math.ceil(df_players['now_cost'].max() * 10) / 10)
+    min_price, max_price = st.slider("Price (£m)", *price_range, price_range, step=0.1)
+    found = player_index.find(search_query, search_position, search_team, min_price, max_price, limit=50)
+    st.dataframe(player_index.rows(found)[['web_name', 'full_name', 'element_type', 'team', 'now_cost']])
+
+# Expected points over the next gameweeks (one array operation, fast enough to recompute per slider move)
+with st.expander("Projected points"):
+    horizon = st.slider("Gameweeks ahead", 1, 10, 5)
+    projection = project_points(df_players, df_fact_player, df_teams, df_fixtures, horizon=horizon)
+    if projection.columns.empty:
+        st.write("No upcoming gameweeks to project.")
+    else:
+        projected = df_players.set_index('id')[['web_name', 'element_type', 'team', 'now_cost']].join(
+            projection.set_axis([f'GW{gw}' for gw in projection.columns], axis=1).round(1))
+        projected['total'] = projection.sum(axis=1).round(1)
+        st.dataframe(projected.sort_values('total', ascending=False).head(50))
+
 # Select maximum players per club
 max_players = st.number_input("Max players/club", min_value=1, max_value=5, value=3)
 
 # Include injured/suspended players
 include_injured = st.checkbox("Include injured/suspended players")
 
+# Squad budget
+budget = st.number_input("Budget (£m)", min_value=80.0, max_value=120.0, value=100.0, step=0.5)
+
 # Select Gameweek
 gameweek = st.number_input("Gameweek", min_value=1, value=8)
 
@@ -42,14 +85,20 @@ metrics = st.multiselect("Select metrics to include", [
 ])
 
 # Drop metric sections for each position
+position_metrics = {}
 for position in ['Forward', 'Midfield', 'Defence']:
     st.subheader(f"{position} Metrics")
     drop_metric_max = st.selectbox(f"Drop metric to maximise {position}", metrics)
     drop_metric_min = st.selectbox(f"Drop metric to minimise {position}", metrics)
+    position_metrics[position] = (drop_metric_max, drop_metric_min)
 
 # Build button
 if st.button("Build ⚽️"):
-    filtered_players = filter_players(players_df, metrics)
-    st.write("Selected Players:")
-    st.dataframe(filtered_players)
+    try:
+        filtered_players = filter_players(df_players, metrics)
+    except ValueError as error:
+        st.error(str(error))
+    else:
+        st.write("Selected Players:")
+        st.dataframe(filtered_players[['web_name', 'element_type', 'team', 'now_cost', 'starter', 'score']])
 
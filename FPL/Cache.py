@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+######################################################
+# cache settings
+######################################################
+# Default cache folder at the root of the repository
+CACHE_DIR = os.environ.get('FPL_CACHE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'http'))
+
+# Time-to-live in seconds per API endpoint. Within the TTL a cached response is served
+# without any network I/O; after it, the response is revalidated with ETag/Last-Modified.
+# element-summary carries the current season's `history` next to the rarely changing
+# `history_past`, so it gets the same short TTL as bootstrap-static (a longer one can be
+# set with FPL_SUMMARY_TTL when stale gameweek rows are acceptable).
+ENDPOINT_TTL = {
+    'bootstrap-static': 5 * 60,
+    'fixtures': 15 * 60,
+    'element-summary': int(os.environ.get('FPL_SUMMARY_TTL', 5 * 60)),
+}
+DEFAULT_TTL = 5 * 60
+
+# Upper bound for the cache folder; least recently used entries are evicted first
+MAX_CACHE_BYTES = int(os.environ.get('FPL_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+
+def endpoint_of(url):
+    """
+    Function that returns the endpoint name of an FPL API url,
+    e.g. '.../api/element-summary/12/' -> 'element-summary'.
+    """
+    parts = [p for p in url.split('?')[0].split('/') if p]
+    for part in reversed(parts):
+        if not part.isdigit():
+            return part
+    return ''
+
+######################################################
+# response cache
+######################################################
+class ResponseCache:
+    """
+    Persistent HTTP response cache keyed by URL. Each entry is stored as
+    `<key>.body` (raw response) and `<key>.meta` (url, ETag, Last-Modified, fetch time).
+    """
+    def __init__(self, cache_dir=CACHE_DIR, ttl=None, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = dict(ENDPOINT_TTL, **(ttl or {}))
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0}
+        # urls answered from the cache without any request in this process
+        self.cached_urls = set()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir))
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.body', base + '.meta'
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def lookup(self, url):
+        """
+        Returns (body, meta, fresh) for a cached url or (None, None, False).
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None, False
+
+        os.utime(body_path)  # mark as recently used for eviction
+        ttl = self.ttl.get(endpoint_of(url), DEFAULT_TTL)
+        fresh = time.time() - meta['fetched_at'] < ttl
+        return body, meta, fresh
+
+    def store(self, url, body, headers):
+        body_path, meta_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        old_size = sum(os.path.getsize(p) for p in (body_path, meta_path) if os.path.exists(p))
+
+        # Write to temp files first so concurrent readers never see a partial entry
+        for path, data, mode in ((body_path, body, 'wb'), (meta_path, json.dumps(meta), 'w')):
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        new_size = os.path.getsize(body_path) + os.path.getsize(meta_path)
+        with self._lock:
+            self._size += new_size - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url):
+        """
+        Resets the TTL of an entry after a 304 Not Modified response.
+        """
+        _, meta_path = self._paths(url)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta['fetched_at'] = time.time()
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    def _evict(self):
+        # Drop least recently used entries until the cache is back under 90% of the limit
+        bodies = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith('.body')]
+        bodies.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+        for body_path in bodies:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            for path in (body_path, body_path[:-len('.body')] + '.meta'):
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    self._size -= size
+                except OSError:
+                    pass
+
+    def get(self, session, url, revalidate=False):
+        """
+        Returns the response body for url, using the cache when fresh and
+        a conditional GET (If-None-Match / If-Modified-Since) when stale or
+        when `revalidate` is set.
+        """
+        body, meta, fresh = self.lookup(url)
+        if body is not None and fresh and not revalidate:
+            self._count('hits')
+            with self._lock:
+                self.cached_urls.add(url)
+            return body
+
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, headers=headers)
+        if response.status_code == 304 and body is not None:
+            self.refresh(url)
+            self._count('revalidated')
+            return body
+
+        response.raise_for_status()
+        self.store(url, response.content, response.headers)
+        self._count('misses')
+        return response.content
+
+    def report(self):
+        total = sum(self.stats.values())
+        return (f"HTTP cache: {self.stats['hits']} hits, {self.stats['revalidated']} revalidated (304), "
+                f"{self.stats['misses']} misses out of {total} requests")
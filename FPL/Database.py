@@ -0,0 +1,116 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from Instrumentation import instrument
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+DATABASE_PATH = os.path.join('data', 'fpl.db')
+
+# Pipeline table -> (schema.sql table, DataFrame column renames)
+TABLES = {
+    'Positions': ('positions', {}),
+    'Teams': ('teams', {}),
+    'Gameweeks': ('gameweeks', {}),
+    'Players': ('players', {}),
+    'Player_history': ('player_history', {}),
+    'Fact_Player': ('fact_table', {'Cost': 'price'}),
+    'Fixtures': ('fixtures', {'event': 'GW'}),
+}
+
+BATCH_SIZE = 5000
+
+######################################################
+# schema
+######################################################
+def connect(db_path=DATABASE_PATH):
+    """
+    Function that opens the SQLite database and creates the tables of schema.sql.
+    """
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+    return conn
+
+def table_columns(conn, table):
+    """
+    Returns (columns, primary key columns) of a table as declared in the schema.
+    """
+    info = conn.execute(f'PRAGMA table_info({table})').fetchall()
+    columns = [row[1] for row in info]
+    primary_key = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5] > 0]
+    return columns, primary_key
+
+######################################################
+# bulk load
+######################################################
+def _to_rows(df):
+    # sqlite3 only accepts plain Python values: timestamps become ISO strings, missing values NULL
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.DatetimeTZDtype):
+            df[col] = df[col].dt.tz_convert('UTC').dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
+        elif df[col].dtype == 'float32':
+            # Widen through the shortest decimal repr so 4.3 is stored as 4.3, not 4.300000190734863
+            df[col] = df[col].astype(str).astype('float64')
+    df = df.astype(object).where(df.notna(), None)
+    return df.itertuples(index=False, name=None)
+
+def upsert(conn, table, df):
+    """
+    Function that inserts df into table in batches, updating rows whose
+    primary key already exists so reruns are idempotent.
+    """
+    columns, primary_key = table_columns(conn, table)
+    # SQLite column names are case-insensitive (schema GW_name vs gw_name)
+    by_lower = {c.lower(): c for c in columns}
+    df_columns = [c for c in df.columns if c.lower() in by_lower]
+    target = [by_lower[c.lower()] for c in df_columns]
+
+    quoted = ', '.join(f'"{c}"' for c in target)
+    placeholders = ', '.join('?' for _ in target)
+    sql = f'INSERT INTO {table} ({quoted}) VALUES ({placeholders})'
+    if primary_key:
+        updates = ', '.join(f'"{c}" = excluded."{c}"' for c in target if c not in primary_key)
+        conflict = ', '.join(f'"{c}"' for c in primary_key)
+        sql += f' ON CONFLICT ({conflict}) DO UPDATE SET {updates}' if updates else f' ON CONFLICT ({conflict}) DO NOTHING'
+
+    rows = _to_rows(df[df_columns])
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+
+@instrument
+def save_to_database(tables, db_path=DATABASE_PATH):
+    """
+    Function that upserts every DataFrame in `tables` ({'Players': df, ...})
+    into the database inside a single transaction.
+    """
+    conn = connect(db_path)
+    try:
+        with conn:  # one transaction: commit on success, rollback on error
+            for name, (table, renames) in TABLES.items():
+                if name in tables:
+                    upsert(conn, table, tables[name].rename(columns=renames))
+    finally:
+        conn.close()
+    print(f"Data saved to database: {db_path}")
+
+def query(sql, params=(), db_path=DATABASE_PATH):
+    """
+    Function that runs a SELECT on the database and returns a DataFrame.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
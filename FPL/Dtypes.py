@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+######################################################
+# dtype registry
+######################################################
+# Column types of every pipeline table, used by the transformations, the Parquet
+# output and the CSV reader. Integers use the narrowest width that holds the API
+# values, stats are float32 (the API sends at most 2 decimals) and the fact
+# table's expected_* strings become numbers. Low-cardinality columns are categoricals.
+INT8 = 'int8'
+INT16 = 'int16'
+INT32 = 'int32'
+INT64 = 'int64'
+FLOAT = 'float32'
+BOOL = 'bool'
+TIME = 'datetime64[ns, UTC]'
+TEXT = 'string'
+CAT = 'category'
+
+INT_TYPES = [INT8, INT16, INT32, INT64]
+
+_STATS = {
+    'goals_scored': INT16, 'assists': INT16, 'clean_sheets': INT16, 'goals_conceded': INT16, 'own_goals': INT8,
+    'penalties_saved': INT8, 'penalties_missed': INT8, 'yellow_cards': INT8, 'red_cards': INT8, 'saves': INT16,
+    'bonus': INT16, 'influence': FLOAT, 'creativity': FLOAT, 'threat': FLOAT, 'ict_index': FLOAT, 'starts': INT16,
+    'expected_goals': FLOAT, 'expected_assists': FLOAT, 'expected_goal_involvements': FLOAT,
+    'expected_goals_conceded': FLOAT,
+}
+
+TABLE_SCHEMAS = {
+    'Players': dict(_STATS, **{
+        'code': INT32, 'id': INT16, 'full_name': TEXT, 'web_name': CAT, 'element_type': CAT, 'team': CAT,
+        'team_code': INT16, 'status': CAT, 'dreamteam_count': INT8, 'news': TEXT, 'news_added': TIME,
+        'now_cost': FLOAT, 'total_points': INT16, 'minutes': INT16, 'bps': INT16, 'event_points': INT16,
+        'form': FLOAT, 'points_per_game': FLOAT, 'selected_by_percent': FLOAT, 'ep_next': FLOAT,
+        'ep_this': FLOAT, 'value_form': FLOAT, 'value_season': FLOAT,
+        'chance_of_playing_next_round': FLOAT, 'chance_of_playing_this_round': FLOAT, 'squad_number': FLOAT,
+        'cost_change_event': INT8, 'cost_change_event_fall': INT8, 'cost_change_start': INT8,
+        'cost_change_start_fall': INT8, 'transfers_in': INT32, 'transfers_out': INT32,
+        'transfers_in_event': INT32, 'transfers_out_event': INT32,
+    }),
+    'Teams': {
+        'code': INT16, 'id': INT16, 'team_name': TEXT, 'short_name': TEXT, 'strength': INT8,
+        'strength_overall_away': INT16, 'strength_overall_home': INT16, 'strength_attack_away': INT16,
+        'strength_attack_home': INT16, 'strength_defence_away': INT16, 'strength_defence_home': INT16,
+    },
+    'Positions': {
+        'id': INT8, 'plural_name': TEXT, 'plural_name_short': TEXT, 'singular_name': TEXT,
+        'singular_name_short': TEXT, 'squad_select': INT8, 'squad_min_play': INT8, 'squad_max_play': INT8,
+    },
+    'Gameweeks': {
+        'id': INT8, 'gw_name': TEXT, 'deadline_time': TIME, 'highest_score': INT16, 'average_entry_score': INT16,
+        'most_selected': INT16, 'most_transferred_in': INT16, 'top_element': INT16, 'most_captained': INT16,
+        'most_vice_captained': INT16, 'transfers_made': INT64,
+    },
+    'Fact_Player': dict(_STATS, **{
+        'element': INT16, 'fixture': INT16, 'opponent_team': INT8, 'total_points': INT16, 'was_home': BOOL,
+        'kickoff_time': TIME, 'team_h_score': INT8, 'team_a_score': INT8, 'GW': INT8, 'minutes_played': INT16,
+        'bps': INT16, 'Cost': FLOAT, 'transfers_balance': INT32, 'selected': INT32, 'transfers_in': INT32,
+        'transfers_out': INT32, 'element_code': INT32,
+    }),
+    'Player_history': dict(_STATS, **{
+        'season_name': CAT, 'element_code': INT32, 'start_cost': FLOAT, 'end_cost': FLOAT,
+        'total_points': INT16, 'minutes': INT16, 'bps': INT16,
+    }),
+    # Feature columns (see Features.py) stay float64: season totals are carried from run to run
+    'Player_features': {'element': INT16, 'GW': INT8},
+    'Fixtures': {
+        'code': INT32, 'event': INT8, 'finished': BOOL, 'finished_provisional': BOOL, 'id': INT16,
+        'kickoff_time': TIME, 'minutes': INT8, 'provisional_start_time': BOOL, 'started': BOOL,
+        'team_a': INT8, 'team_a_score': INT8, 'team_h': INT8, 'team_h_score': INT8,
+        'team_h_difficulty': INT8, 'team_a_difficulty': INT8, 'pulse_id': INT32,
+    },
+}
+
+
+def _int_dtype(values, dtype):
+    # Widen the declared type when the data does not fit it (a bigger season, new
+    # ids), and switch to the nullable type when there are missing values
+    valid = values.dropna()
+    for candidate in INT_TYPES[INT_TYPES.index(dtype):]:
+        info = np.iinfo(candidate)
+        if valid.empty or (valid.min() >= info.min and valid.max() <= info.max):
+            break
+    return candidate.capitalize() if values.isna().any() else candidate
+
+def apply_schema(df, table):
+    """
+    Function that casts the columns of df to the types declared for table.
+    Integer columns missing from the schema are downcast, other columns keep their type.
+    """
+    df = df.copy()
+    schema = TABLE_SCHEMAS.get(table, {})
+    for col in df.columns:
+        dtype = schema.get(col)
+        if dtype is None:
+            if pd.api.types.is_integer_dtype(df[col]) and not pd.api.types.is_extension_array_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif dtype == TIME:
+            # Same resolution whatever was parsed (seconds from CSV, milliseconds from Parquet)
+            df[col] = pd.to_datetime(df[col], utc=True).astype(TIME)
+        elif dtype in INT_TYPES:
+            values = pd.to_numeric(df[col])
+            df[col] = values.astype(_int_dtype(values, dtype))
+        elif dtype == FLOAT:
+            df[col] = pd.to_numeric(df[col]).astype(FLOAT)
+        elif dtype == BOOL and df[col].isna().any():
+            df[col] = df[col].astype('boolean')
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def memory_usage_mb(df):
+    """
+    Function that returns the deep memory usage of df in MB.
+    """
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
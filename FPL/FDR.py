@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+######################################################
+# fixtures enrichment
+######################################################
+def enrich_fixtures(fixtures_df, teams_df):
+    """
+    Function that adds team names and short names to the fixtures with one lookup
+    keyed on team id. team_h/team_a become names (as shown on the dashboard) and the
+    ids are kept in team_h_id/team_a_id.
+    """
+    teams = teams_df.set_index('id')
+    df = fixtures_df.copy()
+    for side in ('h', 'a'):
+        team_id = df[f'team_{side}']
+        df[f'team_{side}_id'] = team_id
+        df[f'team_{side}'] = team_id.map(teams['team_name'])
+        df[f'team_{side}_short'] = team_id.map(teams['short_name'])
+    return df
+
+######################################################
+# FDR matrix
+######################################################
+def fdr_long(fixtures_df):
+    """
+    Function that turns enriched fixtures into one row per (team, fixture) with
+    the opponent label, e.g. 'ARS (H)', and the team's difficulty for that fixture.
+    """
+    home = pd.DataFrame({
+        'team': fixtures_df['team_h_short'],
+        'event': fixtures_df['event'],
+        'label': fixtures_df['team_a_short'] + ' (H)',
+        'difficulty': fixtures_df['team_h_difficulty'],
+    })
+    away = pd.DataFrame({
+        'team': fixtures_df['team_a_short'],
+        'event': fixtures_df['event'],
+        'label': fixtures_df['team_h_short'] + ' (A)',
+        'difficulty': fixtures_df['team_a_difficulty'],
+    })
+    return pd.concat([home, away], ignore_index=True).dropna(subset=['team', 'event'])
+
+def build_fdr_matrix(fixtures_df, upcoming_only=True):
+    """
+    Function that builds the FDR matrices from enriched fixtures (see enrich_fixtures):
+    `labels` (team x 'GW<n>', opponents joined with ', ' in double gameweeks, '' in blank
+    ones) and `difficulty` (same shape, rounded mean difficulty, NaN for blank gameweeks).
+    """
+    if upcoming_only:
+        fixtures_df = fixtures_df[fixtures_df['finished'] == False]
+    long_df = fdr_long(fixtures_df)
+    long_df['event'] = long_df['event'].astype(int)
+    long_df['difficulty'] = long_df['difficulty'].astype(float)
+    if long_df.empty:
+        return pd.DataFrame(dtype=object), pd.DataFrame(dtype=float)
+
+    # Number the fixtures of each team within a gameweek (0, 1 for a double gameweek)
+    # and put them side by side, so labels are joined column-wise instead of per group
+    long_df['slot'] = long_df.groupby(['team', 'event']).cumcount()
+    slots = long_df.pivot(index=['team', 'event'], columns='slot', values='label')
+    label = slots[0]
+    for slot in slots.columns[1:]:
+        label = label.where(slots[slot].isna(), label + ', ' + slots[slot])
+    labels = label.unstack('event', fill_value='')
+    difficulty = long_df.groupby(['team', 'event'])['difficulty'].mean().round().unstack('event')
+
+    gameweeks = sorted(long_df['event'].unique())
+    columns = [f'GW{gw}' for gw in gameweeks]
+    labels = labels.reindex(columns=gameweeks, fill_value='').set_axis(columns, axis=1)
+    difficulty = difficulty.reindex(columns=gameweeks).set_axis(columns, axis=1)
+    labels.index.name = difficulty.index.name = None
+    return labels, difficulty
+
+######################################################
+# difficulty index
+######################################################
+class DifficultyIndex:
+    """
+    Team x gameweek difficulty of the raw fixtures (team ids, not names) with prefix sums
+    over the gameweeks, so the total or mean difficulty of any team from any gameweek over
+    any horizon is O(1). Double gameweeks count both fixtures, blank gameweeks none.
+    """
+    def __init__(self, fixtures_df):
+        fixtures_df = fixtures_df.dropna(subset=['event'])
+        teams = np.concatenate([fixtures_df['team_h'].to_numpy(dtype=np.int64), fixtures_df['team_a'].to_numpy(dtype=np.int64)])
+        events = np.tile(fixtures_df['event'].to_numpy(dtype=np.int64), 2)
+        difficulty = np.concatenate([fixtures_df['team_h_difficulty'].to_numpy(dtype=float),
+                                     fixtures_df['team_a_difficulty'].to_numpy(dtype=float)])
+
+        self.team_ids = np.unique(teams)
+        self.max_gameweek = int(events.max()) if len(events) else 0
+        # Row of every team id (-1 for unknown ids)
+        self._rows = np.full(int(self.team_ids.max()) + 1 if len(teams) else 1, -1)
+        self._rows[self.team_ids] = np.arange(len(self.team_ids))
+
+        # Column g holds gameweek g; prefix[:, k] is the sum over gameweeks < k
+        totals = np.zeros((len(self.team_ids), self.max_gameweek + 1))
+        counts = np.zeros_like(totals)
+        np.add.at(totals, (self._rows[teams], events), difficulty)
+        np.add.at(counts, (self._rows[teams], events), 1)
+        self._difficulty = np.pad(totals.cumsum(axis=1), ((0, 0), (1, 0)))
+        self._fixtures = np.pad(counts.cumsum(axis=1), ((0, 0), (1, 0)))
+
+    def _window(self, prefix, team_ids, start, horizon):
+        team_ids = np.asarray(team_ids, dtype=np.int64)
+        known = (team_ids >= 0) & (team_ids < len(self._rows))
+        rows = self._rows[np.where(known, team_ids, 0)]
+        known &= rows >= 0
+        # Gameweeks [start, start + horizon), clipped to the season
+        first = np.clip(start, 0, self.max_gameweek + 1)
+        last = np.clip(np.asarray(start) + horizon, 0, self.max_gameweek + 1)
+        values = prefix[np.where(known, rows, 0), last] - prefix[np.where(known, rows, 0), first]
+        return np.where(known, values, np.nan)
+
+    def total(self, team_ids, start, horizon):
+        """
+        Sum of the difficulty of the teams' fixtures in gameweeks [start, start + horizon).
+        """
+        return self._window(self._difficulty, team_ids, start, horizon)
+
+    def fixtures(self, team_ids, start, horizon):
+        """
+        Number of fixtures of the teams in gameweeks [start, start + horizon).
+        """
+        return self._window(self._fixtures, team_ids, start, horizon)
+
+    def mean(self, team_ids, start, horizon):
+        """
+        Mean difficulty per fixture in gameweeks [start, start + horizon), NaN without fixtures.
+        """
+        count = self.fixtures(team_ids, start, horizon)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, self.total(team_ids, start, horizon) / count, np.nan)
+
+
+def add_fixture_difficulty(players_df, index, gameweek, horizons=(1, 2, 5, 10)):
+    """
+    Function that returns players_df with 'fdr_next<n>' (mean difficulty of the next n
+    gameweeks from gameweek) and 'fixtures_next<n>' columns for every horizon.
+    """
+    df = players_df.copy()
+    team_ids = df['team'].to_numpy(dtype=np.int64)
+    for horizon in horizons:
+        df[f'fdr_next{horizon}'] = index.mean(team_ids, gameweek, horizon)
+        df[f'fixtures_next{horizon}'] = index.fixtures(team_ids, gameweek, horizon).astype(float)
+    return df
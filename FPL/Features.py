@@ -0,0 +1,105 @@
+import pandas as pd
+
+from Instrumentation import instrument
+
+######################################################
+# feature definitions
+######################################################
+# Rolling windows in gameweeks (the gameweeks the player's team played; a double
+# gameweek counts once with both fixtures summed)
+WINDOWS = [1, 3, 5, 10]
+
+# Fact_Player column -> feature name
+ROLLING_COLUMNS = {
+    'total_points': 'points', 'minutes_played': 'minutes', 'bps': 'bps',
+    'expected_goals': 'xg', 'expected_assists': 'xa', 'expected_goal_involvements': 'xgi',
+    'expected_goals_conceded': 'xgc',
+}
+
+# Features that also get a per-90 version (value / minutes * 90)
+PER_90 = ['points', 'xg', 'xa', 'xgi', 'xgc']
+
+# Season medians over the games a player appeared in (as 'Median points per game' in Optimizer.py)
+MEDIAN_COLUMNS = {'total_points': 'median_points', 'bps': 'median_bps'}
+
+FEATURE_KEYS = ['element', 'GW']
+
+
+def gameweek_totals(fact_df):
+    """
+    Function that sums Fact_Player per player and gameweek (double gameweeks become one row).
+    """
+    df = fact_df[FEATURE_KEYS + list(ROLLING_COLUMNS)].rename(columns=ROLLING_COLUMNS)
+    df['appearances'] = (df['minutes'] > 0).astype('int64')
+    totals = df.groupby(FEATURE_KEYS, sort=True).sum()
+    # float32 stats widened to float64 would carry noise such as 0.10000000149
+    return totals.astype('float64').round(6)
+
+def season_medians(fact_df, index):
+    """
+    Function that returns, for every (element, GW) of index, the median of MEDIAN_COLUMNS
+    over the player's appearances up to that gameweek.
+    """
+    played = fact_df.loc[fact_df['minutes_played'] > 0, ['element', 'GW'] + list(MEDIAN_COLUMNS)]
+    frames = []
+    for gw in index.get_level_values('GW').unique():
+        medians = played[played['GW'] <= gw].groupby('element')[list(MEDIAN_COLUMNS)].median()
+        medians.index = pd.MultiIndex.from_product([medians.index, [gw]], names=FEATURE_KEYS)
+        frames.append(medians)
+    if not frames:
+        return pd.DataFrame(index=index, columns=list(MEDIAN_COLUMNS.values()), dtype='float64')
+    return pd.concat(frames).rename(columns=MEDIAN_COLUMNS).reindex(index).astype('float64')
+
+def _per_90(values, minutes):
+    return (values / minutes * 90).where(minutes > 0)
+
+######################################################
+# feature store
+######################################################
+@instrument
+def build_player_features(fact_df, existing_df=None):
+    """
+    Function that returns the feature table (one row per player and gameweek): totals and
+    per-90 values over the last 1/3/5/10 gameweeks, season totals, per-90s and medians.
+    With existing_df (the table of the previous run) only gameweeks from its last one onwards
+    are computed; the last gameweek is redone as it may still have been in progress.
+    """
+    incremental = existing_df is not None and not existing_df.empty
+    start_gw = existing_df['GW'].max() if incremental else fact_df['GW'].min()
+    totals = gameweek_totals(fact_df[fact_df['GW'] >= start_gw])
+    names = list(totals.columns)
+    # Season-to-date totals are stored, so the next gameweek only needs these and its new rows
+    season = [f'{name}_season' for name in names]
+
+    if incremental:
+        old = existing_df[existing_df['GW'] < start_gw].sort_values(FEATURE_KEYS)
+        # Season totals continue from each player's last stored gameweek
+        base = old.groupby('element')[season].last().set_axis(names, axis=1)
+        cumulative = totals.groupby(level='element').cumsum()
+        cumulative += base.reindex(cumulative.index.get_level_values('element')).fillna(0).to_numpy()
+        # Windows reach back at most max(WINDOWS) stored gameweeks
+        history = old.groupby('element').tail(max(WINDOWS)).set_index(FEATURE_KEYS)[season].set_axis(names, axis=1)
+        combined = pd.concat([history, cumulative]).sort_index()
+    else:
+        old = None
+        cumulative = totals.groupby(level='element').cumsum()
+        combined = cumulative
+
+    # Rolling sums as differences of season totals: vectorised over all players at once
+    features = cumulative.set_axis(season, axis=1)
+    for n in WINDOWS:
+        window = (combined - combined.groupby(level='element').shift(n).fillna(0)).reindex(cumulative.index)
+        for name in names:
+            if name != 'appearances':
+                features[f'{name}_last{n}'] = window[name]
+        for name in PER_90:
+            features[f'{name}_per90_last{n}'] = _per_90(window[name], window['minutes'])
+    for name in PER_90:
+        features[f'{name}_per90_season'] = _per_90(cumulative[name], cumulative['minutes'])
+    features = features.join(season_medians(fact_df, cumulative.index))
+
+    features = features.round(6).reset_index()
+    if old is not None:
+        features = pd.concat([old, features], ignore_index=True)
+    features = features.sort_values(FEATURE_KEYS, kind='stable').reset_index(drop=True)
+    return features
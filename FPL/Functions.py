@@ -1,28 +1,177 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 import pandas as pd
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from Cache import ResponseCache
+from Instrumentation import instrument, recorder
+from Snapshot import SnapshotReader, SnapshotWriter
+
+# Base URL of the FPL API (can be pointed at a local stub server)
+API_BASE = os.environ.get('FPL_API_BASE', 'https://fantasy.premierleague.com/api').rstrip('/')
+
+######################################################
+# HTTP session
+######################################################
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+def get_session(pool_size=16, retries=3, backoff_factor=0.5):
+    """
+    Function that returns one shared requests session with connection pooling
+    and retry/backoff on connection errors, 429 and 5xx responses.
+    """
+    global _session, _session_pool_size
+    with _session_lock:
+        # Rebuild the session when a bigger connection pool is requested
+        if _session is None or pool_size > _session_pool_size:
+            retry = Retry(
+                total=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            # Count status codes, bytes and retries of every response in the run report
+            session.hooks['response'].append(recorder.add_response)
+            _session = session
+            _session_pool_size = pool_size
+        return _session
+
+
+class RateLimiter:
+    """
+    Global rate limiter shared by all worker threads: allows at most
+    `rate` requests per second (None or 0 disables it).
+    """
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+######################################################
+# HTTP response cache
+######################################################
+_cache = None
+
+def get_cache():
+    """
+    Function that returns the shared on-disk response cache, or None when
+    caching is disabled with FPL_CACHE=0.
+    """
+    global _cache
+    if os.environ.get('FPL_CACHE', '1') == '0':
+        return None
+    with _session_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+######################################################
+# raw payload archive / replay
+######################################################
+_archive = None
+_replay = None
+
+def start_archive():
+    """
+    Function that starts a new snapshot: every payload fetched from now on is archived.
+    """
+    global _archive
+    _archive = SnapshotWriter()
+    return _archive
+
+def commit_archive():
+    """
+    Function that writes the manifest of the current snapshot and returns its id.
+    """
+    global _archive
+    if _archive is None:
+        return None
+    snapshot_id = _archive.commit()
+    _archive = None
+    return snapshot_id
+
+def start_replay(snapshot_id='latest'):
+    """
+    Function that serves every request from an archived snapshot (no network I/O);
+    None switches back to the API.
+    """
+    global _replay
+    _replay = SnapshotReader(snapshot_id) if snapshot_id else None
+    return _replay
+
+def get_json(url, revalidate=False):
+    """
+    Function that downloads url (through the response cache) and parses the JSON body.
+    With revalidate a cached response is always checked with the server, even within its TTL.
+    """
+    if _replay is not None:
+        return json.loads(_replay.get(url))
+    cache = get_cache()
+    if cache is None:
+        response = get_session().get(url)
+        response.raise_for_status()
+        body = response.content
+    else:
+        body = cache.get(get_session(), url, revalidate)
+    if _archive is not None:
+        _archive.add(url, body)
+    return json.loads(body)
+
+def get_json_if_changed(url, etag=None):
+    """
+    Function that makes a conditional GET (If-None-Match) past the response cache:
+    returns (None, etag) on 304 Not Modified, otherwise (parsed body, new ETag).
+    """
+    headers = {'If-None-Match': etag} if etag else {}
+    response = get_session().get(url, headers=headers)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    return json.loads(response.content), response.headers.get('ETag')
 
 ######################################################
 # fixture
 ######################################################
+@instrument
 def load_fixture():
-    url = 'https://fantasy.premierleague.com/api/fixtures/'  # Correct URL for fixtures
-    response = requests.get(url)
-    data = json.loads(response.text)
+    url = f'{API_BASE}/fixtures/'  # Correct URL for fixtures
+    data = get_json(url)
     fixtures_df = pd.DataFrame(data)
 
     fixtures_df.drop(columns='stats', inplace=True)
     return fixtures_df
 ######################################################
-# FPL static 
+# FPL static
 ######################################################
+@instrument
 def load_fpl():
     # Fetch data from the Fantasy Premier League API
-    url = 'https://fantasy.premierleague.com/api/bootstrap-static/'
-    response = requests.get(url)
-
+    url = f'{API_BASE}/bootstrap-static/'
     # Convert JSON data to Python objects
-    data = json.loads(response.text)
+    data = get_json(url)
 
     # Create DataFrames for different parts of the data
     players_df = pd.DataFrame(data['elements'])
@@ -35,34 +184,74 @@ def load_fpl():
 ######################################################
 # player history
 ######################################################
-base_url = "https://fantasy.premierleague.com/api/element-summary/{player_id}"
+base_url = API_BASE + "/element-summary/{player_id}"
 
-def fetch_summary(player_id):
+def fetch_summary(player_id, rate_limiter=None, revalidate=False):
     """
     Function that takes player id and returns their history data.
     """
-    response = requests.get(base_url.format(player_id=player_id))
-    return response.json()
+    if rate_limiter is not None:
+        rate_limiter.wait()
+    return get_json(base_url.format(player_id=player_id), revalidate)
 
-def load_player_history(df):
+def fetch_summaries(players_ids, max_workers=1, rate_limit=None, rate_limiter=None, revalidate=False):
+    """
+    Function that fetches element-summary for every player id and returns
+    the payloads in the same order as `players_ids`.
+    With max_workers > 1 the requests run on a bounded thread pool.
+    """
+    rate_limiter = rate_limiter or RateLimiter(rate_limit)
+    if max_workers <= 1:
+        return [fetch_summary(player_id, rate_limiter, revalidate) for player_id in players_ids]
+
+    get_session(pool_size=max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # executor.map yields results in input order
+        return list(executor.map(lambda player_id: fetch_summary(player_id, rate_limiter, revalidate), players_ids))
+
+def fetched_fresh(players_ids):
+    """
+    Function that returns the player ids whose element-summary was not served from
+    the response cache within its TTL in this process (all of them without a cache).
+    """
+    cache = get_cache()
+    if cache is None:
+        return list(players_ids)
+    return [player_id for player_id in players_ids if base_url.format(player_id=player_id) not in cache.cached_urls]
+
+@instrument
+def load_player_history(df, max_workers=1, rate_limit=None, revalidate=False):
     """
     Function to fetch current and previous season data for all players based on their IDs in batches.
     """
     all_players_current = []
     all_players_previous = []
-    
+
     players_ids = df.id.to_list()
 
-    for player_id in players_ids:
-        data = fetch_summary(player_id)  # Consider caching this data
+    for data in fetch_summaries(players_ids, max_workers=max_workers, rate_limit=rate_limit, revalidate=revalidate):
         current_season = data.get('history', [])
         previous_seasons = data.get('history_past', [])
 
         all_players_current.extend(current_season)
         all_players_previous.extend(previous_seasons)
 
-        
+
 
     current_season_df = pd.DataFrame(all_players_current)
     previous_seasons_df = pd.DataFrame(all_players_previous)
-    return current_season_df, previous_seasons_df
\ No newline at end of file
+    return current_season_df, previous_seasons_df
+
+def iter_player_history(df, max_workers=1, rate_limit=None, batch_size=100):
+    """
+    Generator version of load_player_history: yields (current season, previous seasons)
+    DataFrames per batch of `batch_size` players, so only one batch of raw JSON is held at a time.
+    """
+    players_ids = df.id.to_list()
+    rate_limiter = RateLimiter(rate_limit)
+    for start in range(0, len(players_ids), batch_size):
+        batch = fetch_summaries(players_ids[start:start + batch_size], max_workers, rate_limiter=rate_limiter)
+        current_season = [row for data in batch for row in data.get('history', [])]
+        previous_seasons = [row for data in batch for row in data.get('history_past', [])]
+        del batch
+        yield pd.DataFrame(current_season), pd.DataFrame(previous_seasons)
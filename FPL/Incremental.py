@@ -0,0 +1,82 @@
+import json
+import os
+
+import pandas as pd
+
+# bootstrap-static fields that change whenever a player's element-summary changes
+STATE_FIELDS = ['total_points', 'minutes', 'event_points', 'transfers_in_event']
+
+# Primary keys used to merge freshly fetched rows into the existing tables
+FACT_KEYS = ['element', 'fixture', 'GW']
+HISTORY_KEYS = ['season_name', 'element_code']
+
+######################################################
+# state manifest
+######################################################
+def load_state(path):
+    """
+    Function that reads the state manifest {player id: [STATE_FIELDS values]}
+    written by the previous run. Returns None when there is no manifest yet.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get('fields') != STATE_FIELDS:
+        return None  # tracked fields changed, treat as a fresh start
+    return state['players']
+
+def save_state(players_df, path, player_ids=None):
+    """
+    Function that stores the STATE_FIELDS of every player for the next run. With
+    player_ids only those players are updated; the others keep their previous
+    state, or get none so the next incremental run fetches them.
+    """
+    values = players_df.set_index('id')[STATE_FIELDS]
+    players = {str(player_id): [int(v) for v in row] for player_id, row in zip(values.index, values.to_numpy())}
+    if player_ids is not None:
+        previous = load_state(path) or {}
+        updated = {str(player_id) for player_id in player_ids}
+        players = {player_id: row if player_id in updated else previous[player_id]
+                   for player_id, row in players.items() if player_id in updated or player_id in previous}
+    state = {'fields': STATE_FIELDS, 'players': players}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(state, f)
+
+def changed_players(players_df, state):
+    """
+    Function that returns the rows of players_df whose STATE_FIELDS differ from
+    the manifest, plus players that are not in the manifest at all.
+    """
+    current = players_df.set_index('id')[STATE_FIELDS]
+    previous = pd.DataFrame.from_dict(state, orient='index', columns=STATE_FIELDS)
+    previous.index = previous.index.astype(current.index.dtype)
+    previous = previous.reindex(current.index)
+
+    changed = previous.isna().any(axis=1) | current.ne(previous).any(axis=1)
+    return players_df[changed.to_numpy()]
+
+######################################################
+# merge
+######################################################
+def merge_on_key(existing_df, new_df, keys, player_col):
+    """
+    Function that upserts new_df into existing_df: rows with the same primary
+    key are replaced by the new version, other rows are kept. Rows stay grouped per
+    player (player_col) in the order of the previous run, new players last.
+    """
+    if existing_df is None or existing_df.empty:
+        return new_df.reset_index(drop=True)
+    if new_df.empty:
+        return existing_df
+
+    # Keep the column order of the fresh rows (Parquet moves the partition column last)
+    columns = list(new_df.columns) + [c for c in existing_df.columns if c not in new_df.columns]
+    merged = pd.concat([existing_df, new_df], ignore_index=True)[columns]
+    # Players numbered by first appearance, so the stable sort regroups each player's rows
+    # where the previous run had them (new players get the highest ids and go last)
+    player_order = pd.Series(pd.factorize(merged[player_col])[0], index=merged.index)
+    merged = merged.drop_duplicates(subset=keys, keep='last')
+    order = player_order[merged.index].to_numpy().argsort(kind='stable')
+    return merged.iloc[order].reset_index(drop=True)
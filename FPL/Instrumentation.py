@@ -0,0 +1,169 @@
+import datetime
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+REPORT_FILE = os.path.join('data', 'run_report.json')
+HISTORY_FILE = os.path.join('data', 'run_history.jsonl')
+
+######################################################
+# memory
+######################################################
+def current_rss_mb():
+    """
+    Function that returns the resident memory of the process in MB
+    (falls back to the peak RSS where /proc is not available).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+######################################################
+# run recorder
+######################################################
+class RunRecorder:
+    """
+    Collects per-call timings, row counts and memory deltas of the instrumented
+    functions, and the HTTP traffic of the shared session, for one pipeline run.
+    Memory deltas are process-wide, so they overlap when stages run in parallel.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        with self._lock:
+            self.started_at = datetime.datetime.now(datetime.timezone.utc)
+            self._start = time.perf_counter()
+            self.calls = []
+            self.http = {'requests': 0, 'bytes': 0, 'retries': 0, 'status': Counter(), 'by_endpoint': {}}
+
+    def add_call(self, record):
+        with self._lock:
+            self.calls.append(record)
+
+    def add_response(self, response, *args, **kwargs):
+        """
+        requests response hook: counts the final response of every HTTP call.
+        """
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', ()) or ()
+        path = [p for p in response.url.split('?')[0].split('/') if p and not p.isdigit()]
+        size = len(response.content)
+        with self._lock:
+            self.http['requests'] += 1
+            self.http['bytes'] += size
+            self.http['retries'] += len(retries)
+            self.http['status'][str(response.status_code)] += 1
+            # Bytes per endpoint, i.e. per load function (bootstrap-static -> load_fpl, ...)
+            endpoint = self.http['by_endpoint'].setdefault(path[-1] if path else '', {'requests': 0, 'bytes': 0})
+            endpoint['requests'] += 1
+            endpoint['bytes'] += size
+        return response
+
+    def report(self, stage_seconds=None, extra=None):
+        """
+        Returns the run report as a JSON-serialisable dict.
+        """
+        with self._lock:
+            calls = list(self.calls)
+            http = {**self.http, 'status': dict(self.http['status']),
+                    'by_endpoint': {name: dict(counts) for name, counts in self.http['by_endpoint'].items()}}
+        functions = {}
+        for call in calls:
+            summary = functions.setdefault(call['function'], {'calls': 0, 'seconds': 0.0, 'rows': 0})
+            summary['calls'] += 1
+            summary['seconds'] = round(summary['seconds'] + call['seconds'], 4)
+            summary['rows'] += call['rows'] or 0
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': round(time.perf_counter() - self._start, 3),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'http': http,
+            'stages': {name: round(seconds, 4) for name, seconds in (stage_seconds or {}).items()},
+            'functions': functions,
+            'calls': calls,
+            **(extra or {}),
+        }
+
+
+recorder = RunRecorder()
+
+
+def count_rows(result):
+    # Rows of a returned DataFrame, or of every DataFrame in a returned tuple
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, tuple):
+        frames = [len(r) for r in result if isinstance(r, pd.DataFrame)]
+        return sum(frames) if frames else None
+    return None
+
+
+def instrument(func):
+    """
+    Decorator recording wall time, rows returned (or written, for save functions)
+    and the memory delta of every call in the run recorder.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        rows = count_rows(result)
+        if rows is None and args and isinstance(args[0], pd.DataFrame):
+            rows = len(args[0])  # save functions return nothing, count what they were given
+        recorder.add_call({
+            'function': func.__name__,
+            'target': next((a for a in args if isinstance(a, str)), None),
+            'seconds': round(seconds, 4),
+            'rows': rows,
+            'memory_delta_mb': round(current_rss_mb() - rss_before, 1),
+        })
+        return result
+    return wrapper
+
+######################################################
+# report files
+######################################################
+def write_report(report, report_file=REPORT_FILE, history_file=HISTORY_FILE):
+    """
+    Function that writes the JSON run report and appends a one-line summary
+    of the run to the history file.
+    """
+    os.makedirs(os.path.dirname(report_file) or '.', exist_ok=True)
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    summary = {
+        'started_at': report['started_at'],
+        'wall_seconds': report['wall_seconds'],
+        'peak_rss_mb': report['peak_rss_mb'],
+        'requests': report['http']['requests'],
+        'bytes': report['http']['bytes'],
+        'retries': report['http']['retries'],
+        'stages': report['stages'],
+    }
+    with open(history_file, 'a') as f:
+        f.write(json.dumps(summary) + '\n')
+    print(f"Run report saved to {report_file}")
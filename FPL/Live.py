@@ -0,0 +1,283 @@
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+from Database import save_to_database
+from Dtypes import apply_schema
+from Functions import API_BASE, base_url, get_json_if_changed, get_session
+from Incremental import FACT_KEYS
+from Storage import read_table, save_partition, save_to_parquet
+from Transformation import transform_fact_history
+from Views import render_views
+
+# Gameweek-live mode: during a gameweek only `fixtures` is polled (conditional GET). When a
+# fixture of the current event changes, the element-summary of the players of both teams is
+# re-fetched (conditional GET per player), their current-GW rows of Fact_Player are updated
+# in place and every change is appended to a change feed for the dashboard.
+#
+#     python FPL/Live.py [--polls N]
+
+######################################################
+# live settings
+######################################################
+# Poll interval in seconds while matches are being played, and between matchdays
+ACTIVE_INTERVAL = float(os.environ.get('FPL_LIVE_INTERVAL', 60))
+IDLE_INTERVAL = float(os.environ.get('FPL_LIVE_IDLE_INTERVAL', 15 * 60))
+
+# Fact_Player columns published in the change feed (all columns are updated)
+FEED_COLUMNS = ['total_points', 'minutes_played', 'goals_scored', 'assists', 'clean_sheets', 'goals_conceded',
+                'own_goals', 'penalties_saved', 'penalties_missed', 'yellow_cards', 'red_cards', 'saves',
+                'bonus', 'bps']
+
+# One feed file per gameweek: data/live/GW<n>.jsonl
+FEED_DIR = 'live'
+
+
+def current_event(fixtures_df):
+    """
+    Function that returns the gameweek being played: the event of a started but unfinished
+    fixture, otherwise the first event with unfinished fixtures (the last one after the season).
+    """
+    fixtures_df = fixtures_df[fixtures_df['event'].notna()]
+    finished = fixtures_df['finished'].astype(bool)
+    live = fixtures_df[fixtures_df['started'].astype(bool) & ~finished]
+    if not live.empty:
+        return int(live['event'].min())
+    if (~finished).any():
+        return int(fixtures_df.loc[~finished, 'event'].min())
+    return int(fixtures_df['event'].max())
+
+def poll_interval(fixtures_df, now=None):
+    """
+    Function that returns the seconds until the next poll: ACTIVE_INTERVAL while a fixture is
+    in play or waiting for its final bonus points, otherwise IDLE_INTERVAL, shortened so the
+    first poll after the next kickoff is at most ACTIVE_INTERVAL late.
+    """
+    started = fixtures_df['started'].astype(bool)
+    if (started & ~fixtures_df['finished'].astype(bool)).any():
+        return ACTIVE_INTERVAL
+    now = pd.Timestamp.now(tz='UTC') if now is None else now
+    kickoffs = pd.to_datetime(fixtures_df.loc[~started, 'kickoff_time'], utc=True).dropna()
+    kickoffs = kickoffs[kickoffs > now]
+    if kickoffs.empty:
+        return IDLE_INTERVAL
+    until_kickoff = (kickoffs.min() - now).total_seconds()
+    return min(IDLE_INTERVAL, max(ACTIVE_INTERVAL, until_kickoff))
+
+######################################################
+# change feed
+######################################################
+def feed_path(gameweek, data_dir='data'):
+    return os.path.join(data_dir, FEED_DIR, f'GW{gameweek}.jsonl')
+
+def read_feed(gameweek=None, since=0, data_dir='data'):
+    """
+    Function that returns the change feed events with seq > since as a DataFrame
+    (one row per event), for gameweek or the latest gameweek with a feed.
+    """
+    folder = os.path.join(data_dir, FEED_DIR)
+    if gameweek is None:
+        gameweeks = [int(name[2:-6]) for name in os.listdir(folder) if name.endswith('.jsonl')] if os.path.isdir(folder) else []
+        if not gameweeks:
+            return pd.DataFrame()
+        gameweek = max(gameweeks)
+    path = feed_path(gameweek, data_dir)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    with open(path) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return pd.DataFrame([event for event in events if event['seq'] > since])
+
+def _python(value):
+    # numpy scalars and missing values as JSON-friendly values
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+######################################################
+# live updater
+######################################################
+class LiveUpdater:
+    """
+    Keeps Fact_Player up to date during a gameweek. Each poll() costs one conditional
+    request for fixtures (a 304 when nothing moved) plus one conditional request per player
+    of the teams whose fixture changed.
+    """
+    def __init__(self, data_dir='data', formats=('csv',), db_path=None, max_workers=8):
+        self.data_dir = data_dir
+        self.formats = formats
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.fact = read_table('Fact_Player', data_dir=data_dir)
+        # Parquet returns the rows partition by partition and moves the partition column last;
+        # keep the pipeline's order (each player's gameweeks in turn) and CSV column order
+        self.fact = self.fact.sort_values(['element', 'GW'], kind='stable').reset_index(drop=True)
+        csv_path = os.path.join(data_dir, 'Fact_Player.csv')
+        if os.path.exists(csv_path):
+            self.fact = self.fact[pd.read_csv(csv_path, nrows=0).columns.tolist()]
+        players = read_table('Players', columns=['id', 'team'], data_dir=data_dir)
+        self.team_of = pd.Series(players['team'].astype('int64').to_numpy(), index=players['id'].astype('int64').to_numpy())
+        self.teams = read_table('Teams', data_dir=data_dir)
+        self.fixtures = None
+        self._fixture_versions = {}
+        self._etags = {}
+        self.stats = Counter()
+
+    def _fetch(self, url, etags):
+        # The new ETag is only kept in `etags`; poll() stores them once the update is applied
+        payload, etags[url] = get_json_if_changed(url, self._etags.get(url))
+        return payload
+
+    def _count(self, payloads):
+        self.stats['requests'] += len(payloads)
+        self.stats['not_modified'] += sum(payload is None for payload in payloads)
+
+    def poll(self):
+        """
+        Function that runs one live update and returns the change feed events it published.
+        The fixture versions and ETags only advance once the update is applied, so a poll
+        that fails half-way is repeated in full by the next one.
+        """
+        self.stats['polls'] += 1
+        etags = {}
+        payload = self._fetch(f'{API_BASE}/fixtures/', etags)
+        self._count([payload])
+        if payload is None:
+            return []
+
+        versions = {fixture['id']: json.dumps(fixture, sort_keys=True) for fixture in payload}
+        changed_ids = {i for i, version in versions.items() if self._fixture_versions.get(i) != version}
+        # The event being played before this update counts too: once its last fixtures finish,
+        # current_event() already returns the next one, but their final stats are still to fetch
+        gameweeks = {current_event(self.fixtures)} if self.fixtures is not None else set()
+        self.fixtures = pd.DataFrame(payload).drop(columns='stats')
+        gameweeks.add(current_event(self.fixtures))
+
+        events = []
+        changed = self.fixtures[self.fixtures['id'].isin(changed_ids) & self.fixtures['event'].isin(gameweeks)
+                                & self.fixtures['started'].astype(bool)]
+        if not changed.empty:
+            events = self._update(changed, etags)
+        self._fixture_versions = versions
+        self._etags.update(etags)
+        return events
+
+    def _update(self, changed, etags):
+        # Re-fetch the players of the teams of the changed fixtures, then apply, save and publish
+        # their rows of those fixtures gameweek by gameweek
+        teams = set(changed['team_h']) | set(changed['team_a'])
+        players = self.team_of.index[self.team_of.isin(teams)]
+
+        get_session(pool_size=self.max_workers)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            summaries = list(executor.map(lambda player_id: self._fetch(base_url.format(player_id=player_id), etags),
+                                          players))
+        self._count(summaries)
+        event_of = dict(zip(changed['id'], changed['event'].astype('int64')))
+        rows = [row for summary in summaries if summary is not None for row in summary.get('history', [])
+                if event_of.get(row['fixture']) == row['round']]
+        if not rows:
+            return []
+
+        events = []
+        new_df = transform_fact_history(pd.DataFrame(rows))
+        for gameweek, gameweek_df in new_df.groupby('GW'):
+            gameweek, gameweek_df = int(gameweek), gameweek_df.reset_index(drop=True)
+            gameweek_events = self._apply(gameweek_df, gameweek)
+            self._save(gameweek_df, changed[changed['event'] == gameweek], gameweek)
+            self._publish(gameweek_events, gameweek)
+            events += gameweek_events
+        return events
+
+    def _apply(self, new_df, gameweek):
+        # Update the rows of new_df in self.fact in place (appending new ones) and return the changes
+        keys = pd.MultiIndex.from_frame(self.fact[FACT_KEYS].astype('int64'))
+        positions = keys.get_indexer(pd.MultiIndex.from_frame(new_df[FACT_KEYS].astype('int64')))
+        found = positions >= 0
+        feed_columns = [c for c in FEED_COLUMNS if c in new_df.columns and c in self.fact.columns]
+
+        events = []
+        rows, existing = np.flatnonzero(found), positions[found]
+        changes = {}
+        for col in feed_columns:
+            old = self.fact[col].to_numpy()[existing]
+            new = new_df[col].to_numpy()[rows]
+            differs = ~((old == new) | (pd.isna(old) & pd.isna(new)))
+            for i in np.flatnonzero(differs):
+                changes.setdefault(i, {})[col] = [_python(old[i]), _python(new[i])]
+        for i, row_changes in sorted(changes.items()):
+            row = new_df.iloc[rows[i]]
+            events.append({'type': 'update', 'element': int(row['element']), 'fixture': int(row['fixture']),
+                           'GW': gameweek, 'changes': row_changes})
+
+        columns = [c for c in new_df.columns if c in self.fact.columns and c not in FACT_KEYS]
+        for col in columns:
+            self.fact.iloc[existing, self.fact.columns.get_loc(col)] = new_df[col].to_numpy()[rows]
+
+        added = new_df[~found]
+        for _, row in added.iterrows():
+            events.append({'type': 'new', 'element': int(row['element']), 'fixture': int(row['fixture']),
+                           'GW': gameweek, 'values': {c: _python(row[c]) for c in feed_columns}})
+        if not added.empty:
+            self.fact = apply_schema(pd.concat([self.fact, added], ignore_index=True)
+                                     .sort_values(['element', 'GW'], kind='stable').reset_index(drop=True), 'Fact_Player')
+        self.stats['updated_rows'] += len(changes) + len(added)
+        return events
+
+    def _save(self, new_df, changed_fixtures, gameweek):
+        # Fact_Player: only the current gameweek's partition (Parquet) or rows (database) are rewritten
+        if 'csv' in self.formats:
+            self.fact.to_csv(os.path.join(self.data_dir, 'Fact_Player.csv'), index=False)
+            self.fixtures.to_csv(os.path.join(self.data_dir, 'Fixtures.csv'), index=False)
+        if 'parquet' in self.formats:
+            parquet_dir = os.path.join(self.data_dir, 'parquet')
+            save_partition(self.fact[self.fact['GW'] == gameweek], 'Fact_Player', gameweek, parquet_dir)
+            save_to_parquet(self.fixtures, 'Fixtures', parquet_dir)
+        if self.db_path:
+            save_to_database({'Fact_Player': new_df, 'Fixtures': changed_fixtures}, self.db_path)
+        render_views(self.fixtures, self.teams, os.path.join(self.data_dir, 'views'))
+
+    def _publish(self, events, gameweek):
+        path = feed_path(gameweek, self.data_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        seq = len(read_feed(gameweek, data_dir=self.data_dir))
+        now = pd.Timestamp.now(tz='UTC').isoformat()
+        with open(path, 'a') as f:
+            for event in events:
+                seq += 1
+                f.write(json.dumps(dict(event, seq=seq, time=now)) + '\n')
+
+    def run(self, max_polls=None):
+        """
+        Function that polls until interrupted (or max_polls), sleeping poll_interval() between polls.
+        A failed request is logged and the poll is retried at the next interval.
+        """
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            try:
+                events = self.poll()
+                outcome = (f"{len(events)} changes, {self.stats['requests']} requests "
+                           f"({self.stats['not_modified']} not modified)")
+            except (requests.RequestException, ValueError) as e:
+                self.stats['errors'] += 1
+                outcome = f"failed ({e!r})"
+            interval = poll_interval(self.fixtures) if self.fixtures is not None else IDLE_INTERVAL
+            print(f"Live poll {polls}: {outcome}, next poll in {interval:.0f}s")
+            if max_polls is None or polls < max_polls:
+                time.sleep(interval)
+
+if __name__ == "__main__":
+    output_format = os.environ.get('FPL_OUTPUT_FORMAT', 'csv')
+    formats = [fmt for fmt in ('csv', 'parquet') if output_format in (fmt, 'both')]
+    max_polls = int(sys.argv[sys.argv.index('--polls') + 1]) if '--polls' in sys.argv else None
+    updater = LiveUpdater(formats=formats, db_path=os.environ.get('FPL_DATABASE'),
+                          max_workers=int(os.environ.get('FPL_MAX_WORKERS', 8)))
+    updater.run(max_polls)
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import pulp
+
+from FDR import DifficultyIndex
+
+######################################################
+# metrics
+######################################################
+# Dashboard metric -> (column of Players.csv, direction). Direction -1 means lower is better.
+PLAYER_METRICS = {
+    'Dreamteam Count': ('dreamteam_count', 1),
+    'Form': ('form', 1),
+    'Points per game': ('points_per_game', 1),
+    'Selected by %': ('selected_by_percent', 1),
+    'Goals scored': ('goals_scored', 1),
+    'Assists': ('assists', 1),
+    'Minutes played': ('minutes', 1),
+    'ICT Index': ('ict_index', 1),
+    'Creativity': ('creativity', 1),
+    'Threat': ('threat', 1),
+    'Influence': ('influence', 1),
+    'Clean sheets': ('clean_sheets', 1),
+    'Goals conceded': ('goals_conceded', -1),
+    'Yellow cards': ('yellow_cards', -1),
+    'Red cards': ('red_cards', -1),
+    'xG': ('expected_goals', 1),
+    'xA': ('expected_assists', 1),
+    'xG/90': ('expected_goals_per_90', 1),
+    'xA/90': ('expected_assists_per_90', 1),
+    'xGI/90': ('expected_goal_involvements_per_90', 1),
+    'xGI': ('expected_goal_involvements', 1),
+    'xGC/90': ('expected_goals_conceded_per_90', -1),
+    'xGC': ('expected_goals_conceded', -1),
+    'Price': ('now_cost', -1),
+    'Transfers in': ('transfers_in', 1),
+    'Transfers out': ('transfers_out', -1),
+}
+
+# Metrics computed from Fact_Player (median over the games a player appeared in)
+FACT_METRICS = {
+    'Median points per game': ('total_points', 1),
+    'Median BPS': ('bps', 1),
+}
+
+# 'Fixture difficulty (n)': average difficulty of the team's next n gameweeks, lower is better
+FIXTURE_HORIZONS = {f'Fixture difficulty ({n})': n for n in (1, 2, 5, 10)}
+
+# Dashboard position names -> element_type
+POSITION_TYPES = {'Goalkeeper': 1, 'Defence': 2, 'Midfield': 3, 'Forward': 4}
+
+# Statuses that count as injured/suspended/unavailable
+UNAVAILABLE_STATUS = ['i', 's', 'u', 'n']
+
+# Weight of bench players in the objective relative to starters
+BENCH_WEIGHT = 0.1
+
+
+def metric_matrix(players_df, metrics, fact_df=None, difficulty=None, gameweek=None):
+    """
+    Function that returns a DataFrame (one row per player, one column per metric) with
+    the raw values of the selected dashboard metrics, and the list of their directions.
+    Fixture difficulty metrics are looked up in `difficulty` (an FDR.DifficultyIndex).
+    """
+    columns, directions = {}, []
+    for metric in metrics:
+        if metric in PLAYER_METRICS:
+            column, direction = PLAYER_METRICS[metric]
+            values = pd.to_numeric(players_df[column], errors='coerce')
+        elif metric in FACT_METRICS:
+            column, direction = FACT_METRICS[metric]
+            played = fact_df[fact_df['minutes_played'] > 0]
+            values = players_df['id'].map(played.groupby('element')[column].median())
+        elif metric in FIXTURE_HORIZONS:
+            direction = -1
+            values = pd.Series(difficulty.mean(players_df['team'].to_numpy(dtype=np.int64), gameweek, FIXTURE_HORIZONS[metric]))
+        else:
+            raise ValueError(f"Unknown metric: {metric}")
+        columns[metric] = values.to_numpy(dtype=float)
+        directions.append(direction)
+    return pd.DataFrame(columns, index=players_df.index), directions
+
+
+def metric_scores(values, directions, weights=None):
+    """
+    Function that z-scores every metric column (missing values count as average),
+    flips metrics where lower is better and returns the weighted sum per player.
+    """
+    X = values.to_numpy(dtype=float)
+    if X.shape[1] == 0:
+        return np.zeros(len(values))
+    mean = np.nanmean(X, axis=0)
+    std = np.nanstd(X, axis=0)
+    std[~(std > 0)] = 1.0
+    Z = np.nan_to_num((X - mean) / std)
+    w = np.asarray(directions, dtype=float)
+    if weights is not None:
+        w = w * np.asarray([weights.get(m, 1.0) for m in values.columns], dtype=float)
+    return Z @ w
+
+######################################################
+# squad selection
+######################################################
+def build_squad(players_df, positions_df, metrics, budget=100.0, max_per_club=3, include_injured=False,
+                weights=None, position_metrics=None, fact_df=None, fixtures_df=None, gameweek=None):
+    """
+    Function that picks the 15-player squad and starting XI maximising the weighted metrics.
+    Constraints: budget on now_cost, squad_select players per position, starting XI between
+    squad_min_play and squad_max_play per position, and at most max_per_club per team.
+    position_metrics maps a position name to (metric to maximise, metric to minimise), both on
+    the metric's raw value; those metrics only count for players of that position.
+    Returns the selected players with 'starter' and 'score' columns.
+    """
+    players = players_df
+    if not include_injured:
+        players = players[~players['status'].isin(UNAVAILABLE_STATUS)]
+    players = players.reset_index(drop=True)
+
+    # Team x gameweek difficulty with prefix sums, built once for every horizon
+    difficulty = DifficultyIndex(fixtures_df) if fixtures_df is not None else None
+    values, directions = metric_matrix(players, metrics, fact_df, difficulty, gameweek)
+    scores = metric_scores(values, directions, weights)
+
+    # Position specific metrics only add to the score of that position's players. They act on
+    # the raw value (no lower-is-better flip): maximise favours high values, minimise low ones
+    for position, (maximise, minimise) in (position_metrics or {}).items():
+        in_position = (players['element_type'] == POSITION_TYPES[position]).to_numpy()
+        for metric, sign in ((maximise, 1), (minimise, -1)):
+            if metric:
+                extra_values, _ = metric_matrix(players, [metric], fact_df, difficulty, gameweek)
+                scores = scores + sign * in_position * metric_scores(extra_values, [1])
+
+    # Work in tenths of a million, like the API, so the budget check is exact
+    costs = np.rint(players['now_cost'].to_numpy(dtype=float) * 10)
+    ids = players.index.to_list()
+
+    problem = pulp.LpProblem('fpl_squad', pulp.LpMaximize)
+    in_squad = pulp.LpVariable.dicts('squad', ids, cat='Binary')
+    starter = pulp.LpVariable.dicts('starter', ids, cat='Binary')
+
+    problem += pulp.lpSum(float(scores[i]) * (starter[i] + BENCH_WEIGHT * in_squad[i]) for i in ids)
+    problem += pulp.lpSum(int(costs[i]) * in_squad[i] for i in ids) <= round(budget * 10)
+    for i in ids:
+        problem += starter[i] <= in_squad[i]
+
+    squad_size = int(positions_df['squad_select'].sum())
+    problem += pulp.lpSum(in_squad[i] for i in ids) == squad_size
+    problem += pulp.lpSum(starter[i] for i in ids) == 11
+    for _, position in positions_df.iterrows():
+        members = players.index[players['element_type'] == position['id']].to_list()
+        problem += pulp.lpSum(in_squad[i] for i in members) == int(position['squad_select'])
+        problem += pulp.lpSum(starter[i] for i in members) >= int(position['squad_min_play'])
+        problem += pulp.lpSum(starter[i] for i in members) <= int(position['squad_max_play'])
+
+    for _, members in players.groupby('team').groups.items():
+        problem += pulp.lpSum(in_squad[i] for i in members) <= max_per_club
+
+    problem.solve(pulp.PULP_CBC_CMD(msg=False))
+    if pulp.LpStatus[problem.status] != 'Optimal':
+        raise ValueError(f"No valid squad found ({pulp.LpStatus[problem.status]})")
+
+    selected = [i for i in ids if in_squad[i].value() > 0.5]
+    squad = players.loc[selected].copy()
+    squad['starter'] = [starter[i].value() > 0.5 for i in selected]
+    squad['score'] = scores[selected]
+    return squad.sort_values(['starter', 'element_type', 'score'], ascending=[False, True, False])
@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+######################################################
+# stage scheduler
+######################################################
+class Stage:
+    """
+    One pipeline step: `func` is called with the results of `deps` as positional arguments.
+    """
+    def __init__(self, name, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+
+
+def check_stages(stages):
+    """
+    Function that validates the stage graph (unknown dependencies, duplicates, cycles)
+    and returns the stages in a valid execution order.
+    """
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+    ordered, done = [], set()
+    remaining = list(stages)
+    while remaining:
+        ready = [s for s in remaining if all(d in done for d in s.deps)]
+        if not ready:
+            raise ValueError(f"Cycle between stages: {[s.name for s in remaining]}")
+        for stage in ready:
+            ordered.append(stage)
+            done.add(stage.name)
+        remaining = [s for s in remaining if s.name not in done]
+    return ordered
+
+
+def run_stages(stages, max_workers=4):
+    """
+    Function that runs every stage once, as soon as all of its dependencies
+    have finished, with independent stages running concurrently on a thread pool.
+    Returns (results, timings) dicts keyed by stage name.
+    """
+    pending = {stage.name: stage for stage in check_stages(stages)}
+    results, timings = {}, {}
+    running = {}
+
+    def run(stage):
+        start = time.perf_counter()
+        result = stage.func(*(results[d] for d in stage.deps))
+        timings[stage.name] = time.perf_counter() - start
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Submit every stage whose dependencies are all available
+            for name, stage in list(pending.items()):
+                if all(d in results for d in stage.deps):
+                    running[executor.submit(run, stage)] = name
+                    del pending[name]
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+
+    return results, timings
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+######################################################
+# scoring
+######################################################
+# FPL points per event by element_type (1 GK, 2 DEF, 3 MID, 4 FWD)
+GOAL_POINTS = {1: 10, 2: 6, 3: 5, 4: 4}
+CLEAN_SHEET_POINTS = {1: 4, 2: 4, 3: 1, 4: 0}
+CONCEDED_POINTS = {1: -0.5, 2: -0.5, 3: 0, 4: 0}  # -1 per 2 goals conceded
+ASSIST_POINTS = 3
+SAVE_POINTS = 1 / 3  # 1 point per 3 saves
+YELLOW_POINTS = -1
+RED_POINTS = -3
+
+# Gameweeks of Fact_Player the per-90 rates are computed from
+RATE_WINDOW = 10
+
+# Per-90 rates: Fact_Player column -> rate name
+RATE_COLUMNS = {
+    'expected_goals': 'xg90', 'expected_assists': 'xa90', 'expected_goals_conceded': 'xgc90',
+    'bonus': 'bonus90', 'saves': 'saves90', 'yellow_cards': 'yc90', 'red_cards': 'rc90',
+}
+
+
+def player_rates(fact_df, players_df, window=RATE_WINDOW):
+    """
+    Function that returns per-player rates (index aligned with players_df) over the last `window`
+    gameweeks: expected minutes per fixture, the share of fixtures played and played 60+ minutes,
+    and per-90 xG, xA, xGC, bonus, saves and cards.
+    """
+    recent = fact_df[fact_df['GW'] > fact_df['GW'].max() - window]
+    minutes = recent['minutes_played'].astype(float)
+    stats = recent[list(RATE_COLUMNS)].astype(float).rename(columns=RATE_COLUMNS)
+    stats['minutes'] = minutes
+    stats['played'] = (minutes > 0).astype(float)
+    stats['played_60'] = (minutes >= 60).astype(float)
+    stats['element'] = recent['element'].to_numpy()
+
+    grouped = stats.groupby('element')
+    totals = grouped.sum()
+    fixtures = grouped.size()
+    rates = totals[list(RATE_COLUMNS.values())].div(totals['minutes'].where(totals['minutes'] > 0), axis=0) * 90
+    rates['minutes'] = totals['minutes'] / fixtures
+    rates['p_play'] = totals['played'] / fixtures
+    rates['p_60'] = totals['played_60'] / fixtures
+    return rates.reindex(players_df['id'].to_numpy()).fillna(0).set_axis(players_df.index)
+
+
+def fixture_arrays(fixtures_df, teams_df, gameweeks):
+    """
+    Function that returns team x gameweek x fixture-slot arrays (slot 1 is the second fixture of
+    a double gameweek) for the upcoming fixtures: `valid`, `attack` (multiplier on a team's
+    scoring rates) and `defence` (multiplier on its conceding rate). The multipliers come from
+    the opponent's strength at that venue relative to the league average, times the team's own
+    home/away strength relative to its average.
+    """
+    teams = teams_df.set_index('id')
+    size = int(teams.index.max()) + 1
+    strength = {}
+    for column in ('strength_attack_home', 'strength_attack_away', 'strength_defence_home', 'strength_defence_away'):
+        strength[column] = np.ones(size)
+        strength[column][teams.index.to_numpy(dtype=np.int64)] = teams[column].to_numpy(dtype=float)
+    attack_mean = (strength['strength_attack_home'] + strength['strength_attack_away']) / 2
+    defence_mean = (strength['strength_defence_home'] + strength['strength_defence_away']) / 2
+    league_attack = attack_mean[teams.index].mean()
+    league_defence = defence_mean[teams.index].mean()
+
+    upcoming = fixtures_df[fixtures_df['event'].isin(gameweeks)]
+    home = upcoming['team_h'].to_numpy(dtype=np.int64)
+    away = upcoming['team_a'].to_numpy(dtype=np.int64)
+    team = np.concatenate([home, away])
+    opponent = np.concatenate([away, home])
+    at_home = np.concatenate([np.ones(len(home), bool), np.zeros(len(away), bool)])
+    column = np.searchsorted(gameweeks, np.tile(upcoming['event'].to_numpy(dtype=np.int64), 2))
+
+    own_attack = np.where(at_home, strength['strength_attack_home'][team], strength['strength_attack_away'][team])
+    own_defence = np.where(at_home, strength['strength_defence_home'][team], strength['strength_defence_away'][team])
+    opp_attack = np.where(at_home, strength['strength_attack_away'][opponent], strength['strength_attack_home'][opponent])
+    opp_defence = np.where(at_home, strength['strength_defence_away'][opponent], strength['strength_defence_home'][opponent])
+    attack = (own_attack / attack_mean[team]) * (league_defence / opp_defence)
+    defence = (defence_mean[team] / own_defence) * (opp_attack / league_attack)
+
+    # Fixture slot within (team, gameweek): 0, or 1 for the second game of a double gameweek
+    order = np.lexsort((column, team))
+    key = team[order] * len(gameweeks) + column[order]
+    first = np.r_[True, key[1:] != key[:-1]]
+    run_start = np.maximum.accumulate(np.where(first, np.arange(len(key)), 0))
+    slot = np.empty(len(key), dtype=np.int64)
+    slot[order] = np.arange(len(key)) - run_start
+    slots = int(slot.max()) + 1 if len(slot) else 1
+
+    arrays = {name: np.zeros((size, len(gameweeks), slots)) for name in ('attack', 'defence')}
+    arrays['valid'] = np.zeros((size, len(gameweeks), slots), dtype=bool)
+    arrays['attack'][team, column, slot] = attack
+    arrays['defence'][team, column, slot] = defence
+    arrays['valid'][team, column, slot] = True
+    return arrays
+
+
+def project_points(players_df, fact_df, teams_df, fixtures_df, start_gw=None, horizon=10, window=RATE_WINDOW):
+    """
+    Function that returns the expected points of every player (rows, indexed by player id)
+    in every gameweek from start_gw (default: the first gameweek with unfinished fixtures)
+    over `horizon` gameweeks (columns). Double gameweeks add both fixtures, blank ones are 0.
+    Computed as one array expression over players x gameweeks x fixtures. Without an
+    unfinished fixture (after the season) there are no gameweek columns.
+    """
+    if start_gw is None:
+        unfinished = fixtures_df.loc[fixtures_df['finished'] == False, 'event'].dropna()
+        if unfinished.empty:
+            return pd.DataFrame(index=players_df['id'].to_numpy(), columns=pd.Index([], dtype=np.int64), dtype=float)
+        start_gw = int(unfinished.min())
+    gameweeks = np.arange(start_gw, start_gw + horizon)
+    rates = player_rates(fact_df, players_df, window)
+    fixtures = fixture_arrays(fixtures_df, teams_df, gameweeks)
+
+    position = players_df['element_type'].to_numpy(dtype=np.int64)
+    team = players_df['team'].to_numpy(dtype=np.int64)
+    share = (rates['minutes'] / 90).to_numpy()[:, None, None]
+
+    def per_position(points):
+        lookup = np.zeros(max(points) + 1)
+        lookup[list(points)] = list(points.values())
+        return lookup[position][:, None, None]
+
+    def rate(name):
+        return rates[name].to_numpy()[:, None, None]
+
+    # Per fixture: appearance + goals/assists scaled by attack + clean sheet/conceded scaled by defence
+    attack = fixtures['attack'][team]
+    defence = fixtures['defence'][team]
+    conceded = rate('xgc90') * defence
+    points = (
+        rate('p_play') + rate('p_60')
+        + share * (rate('bonus90') + SAVE_POINTS * rate('saves90') + YELLOW_POINTS * rate('yc90') + RED_POINTS * rate('rc90'))
+        + share * attack * (per_position(GOAL_POINTS) * rate('xg90') + ASSIST_POINTS * rate('xa90'))
+        + per_position(CLEAN_SHEET_POINTS) * rate('p_60') * np.exp(-conceded)
+        + per_position(CONCEDED_POINTS) * share * conceded
+    )
+    expected = np.where(fixtures['valid'][team], points, 0.0).sum(axis=2)
+
+    # Flagged players: chance of playing for the next gameweek, 0 for players who left the league
+    if 'chance_of_playing_next_round' in players_df.columns:
+        chance = pd.to_numeric(players_df['chance_of_playing_next_round'], errors='coerce').fillna(100).to_numpy() / 100
+        expected[:, 0] *= chance
+    if 'status' in players_df.columns:
+        expected[players_df['status'].astype(str).to_numpy() == 'u'] = 0.0
+
+    return pd.DataFrame(expected, index=players_df['id'].to_numpy(), columns=gameweeks)
@@ -0,0 +1,196 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Letters NFKD does not decompose into a base letter plus accent
+_TRANSLITERATE = str.maketrans({'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ß': 'ss', 'đ': 'd', 'ł': 'l', 'ı': 'i', 'þ': 'th'})
+
+def normalize_name(text):
+    """
+    Function that lower-cases a name and strips accents and punctuation,
+    e.g. 'Ødegaard' -> 'odegaard', 'N'Dicka' -> 'n dicka'.
+    """
+    text = unicodedata.normalize('NFKD', str(text).casefold().translate(_TRANSLITERATE))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(re.split(r'[^0-9a-z]+', text)).strip()
+
+def trigrams(text):
+    # Padded so that short names and word starts get their own trigrams
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+######################################################
+# player index
+######################################################
+class PlayerIndex:
+    """
+    Lookup structures over the players table, built once per data version:
+    - sorted name tokens (web_name, full_name and every word of them) for prefix search
+    - trigram postings for typo-tolerant search
+    - id <-> code maps, to join Fact_Player.element and Player_history.element_code
+    - now_cost sorted per position and per team for price-range queries
+    Queries return row positions in players_df, or the matching rows with `rows()`.
+    """
+    def __init__(self, players_df):
+        self.players = players_df.reset_index(drop=True)
+        self.ids = self.players['id'].to_numpy(dtype=np.int64)
+        self.codes = self.players['code'].to_numpy(dtype=np.int64)
+        self.costs = self.players['now_cost'].to_numpy(dtype=float)
+
+        # id -> row as a dense array (ids are small), code -> row through a hash index
+        self._row_of_id = np.full(self.ids.max() + 1 if len(self.ids) else 1, -1)
+        self._row_of_id[self.ids] = np.arange(len(self.ids))
+        self._code_index = pd.Index(self.codes)
+
+        # Tokens of web_name rank before the same tokens of full_name
+        names = defaultdict(set)
+        ranked_tokens = {}
+        for column, penalty in (('web_name', 0.0), ('full_name', 0.5)):
+            if column in self.players.columns:
+                for row, name in enumerate(self.players[column].astype(str)):
+                    normalized = normalize_name(name)
+                    for token in [normalized] + normalized.split():
+                        if token:
+                            names[row].add(token)
+                            ranked_tokens.setdefault((token, row), penalty)
+        tokens = sorted(ranked_tokens.items())
+        self._tokens = np.array([token for (token, _), _ in tokens], dtype=object)
+        self._token_rows = np.array([row for (_, row), _ in tokens], dtype=np.int64)
+        self._token_penalty = np.array([penalty for _, penalty in tokens])
+
+        postings = defaultdict(set)
+        for row, row_tokens in names.items():
+            for token in row_tokens:
+                for gram in trigrams(token):
+                    postings[gram].add(row)
+        self._trigrams = {gram: np.fromiter(rows, dtype=np.int64) for gram, rows in postings.items()}
+
+        order = np.argsort(self.costs, kind='stable')
+        self._all = (self.costs[order], order)
+        self._by_position = self._sorted_costs('element_type')
+        self._by_team = self._sorted_costs('team')
+
+    def _sorted_costs(self, column):
+        # {value: (costs ascending, rows)} for binary searches on price
+        keys = self.players[column].to_numpy(dtype=np.int64)
+        groups = {}
+        for key in np.unique(keys):
+            rows = np.flatnonzero(keys == key)
+            order = np.argsort(self.costs[rows], kind='stable')
+            groups[int(key)] = (self.costs[rows][order], rows[order])
+        return groups
+
+    ######################################################
+    # name search
+    ######################################################
+    def _prefix_word(self, word):
+        # {row: fewest extra letters} over the tokens starting with word
+        lo = np.searchsorted(self._tokens, word, side='left')
+        hi = np.searchsorted(self._tokens, word + '\uffff', side='left')
+        extra = {}
+        for token, row, penalty in zip(self._tokens[lo:hi], self._token_rows[lo:hi], self._token_penalty[lo:hi]):
+            extra[row] = min(extra.get(row, np.inf), len(token) - len(word) + penalty)
+        return extra
+
+    def prefix(self, query):
+        """
+        Rows where every word of query starts a name or a word of a name (accent-insensitive),
+        closest matches first: 'salah' ranks M.Salah before Salaheddine.
+        """
+        words = normalize_name(query).split()
+        if not words:
+            return np.arange(len(self.players))
+        matches = [self._prefix_word(word) for word in words]
+        rows = set(matches[0]).intersection(*matches[1:])
+        ranked = sorted(rows, key=lambda row: (sum(match[row] for match in matches), row))
+        return np.asarray(ranked, dtype=np.int64)
+
+    def fuzzy(self, query, min_similarity=0.4):
+        """
+        Rows sharing at least min_similarity of the query's trigrams, best matches first.
+        """
+        query_grams = trigrams(normalize_name(query))
+        postings = [self._trigrams[gram] for gram in query_grams if gram in self._trigrams]
+        if not postings:
+            return np.array([], dtype=np.int64)
+        counts = np.bincount(np.concatenate(postings), minlength=len(self.players))
+        similarity = counts / len(query_grams)
+        rows = np.flatnonzero(similarity >= min_similarity)
+        return rows[np.argsort(-similarity[rows], kind='stable')]
+
+    def search(self, query, limit=20):
+        """
+        Prefix matches first, then typo-tolerant trigram matches; at most limit rows.
+        """
+        rows = list(self.prefix(query)) if normalize_name(query) else []
+        if len(rows) < limit:
+            seen = set(rows)
+            rows += [row for row in self.fuzzy(query) if row not in seen]
+        return np.asarray(rows[:limit], dtype=np.int64)
+
+    ######################################################
+    # id / code lookups
+    ######################################################
+    def rows_for_ids(self, ids):
+        """
+        Rows of element ids (e.g. Fact_Player.element), -1 for unknown ids.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        known = (ids >= 0) & (ids < len(self._row_of_id))
+        return np.where(known, self._row_of_id[np.where(known, ids, 0)], -1)
+
+    def rows_for_codes(self, codes):
+        """
+        Rows of player codes (e.g. Player_history.element_code), -1 for unknown codes.
+        """
+        return self._code_index.get_indexer(np.asarray(codes, dtype=np.int64))
+
+    def code_for_ids(self, ids):
+        rows = self.rows_for_ids(ids)
+        return np.where(rows >= 0, self.codes[rows], -1)
+
+    def id_for_codes(self, codes):
+        rows = self.rows_for_codes(codes)
+        return np.where(rows >= 0, self.ids[rows], -1)
+
+    ######################################################
+    # filters
+    ######################################################
+    def price_range(self, min_price=None, max_price=None, position=None, team=None):
+        """
+        Rows with min_price <= now_cost <= max_price, optionally of one position
+        (element_type) and/or team, found by binary search on the sorted costs.
+        """
+        groups = []
+        if position is not None:
+            groups.append(self._by_position.get(int(position), (np.array([]), np.array([], dtype=np.int64))))
+        if team is not None:
+            groups.append(self._by_team.get(int(team), (np.array([]), np.array([], dtype=np.int64))))
+        if not groups:
+            groups.append(self._all)
+
+        result = None
+        for costs, rows in groups:
+            lo = 0 if min_price is None else np.searchsorted(costs, min_price - 1e-6, side='left')
+            hi = len(costs) if max_price is None else np.searchsorted(costs, max_price + 1e-6, side='right')
+            result = rows[lo:hi] if result is None else np.intersect1d(result, rows[lo:hi])
+        return np.sort(result)
+
+    def find(self, query=None, position=None, team=None, min_price=None, max_price=None, limit=None):
+        """
+        Rows matching all the given filters; with a query they are ordered by match quality.
+        """
+        rows = self.price_range(min_price, max_price, position, team)
+        if query and normalize_name(query):
+            matches = self.search(query, limit=len(self.players))
+            rows = matches[np.isin(matches, rows)]
+        return rows[:limit] if limit else rows
+
+    def rows(self, rows):
+        """
+        The players_df rows at the given positions.
+        """
+        return self.players.iloc[np.asarray(rows, dtype=np.int64)]
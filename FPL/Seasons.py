@@ -0,0 +1,130 @@
+import os
+import sys
+
+import pandas as pd
+
+from Dtypes import apply_schema
+from Instrumentation import instrument
+from Storage import _restore_categories
+
+# Season-partitioned storage of the per-gameweek tables, so several seasons can be kept and
+# queried together: data/seasons/<table>/season=<start year>/part-0.parquet.
+# Multi-season mode of the pipeline (FPL_MULTI_SEASON=1) writes the current season on every run.
+# Past seasons are backfilled from a folder of pipeline CSVs, e.g. the data/ folder of a nightly
+# commit from that season, or by replaying an archived snapshot (FPL_REPLAY):
+#     git archive <commit> data | tar -x -C /tmp/2023-24
+#     python FPL/Seasons.py backfill /tmp/2023-24/data
+SEASONS_DIR = os.path.join('data', 'seasons')
+
+# Tables kept per season
+SEASON_TABLES = ['Fact_Player', 'Fixtures', 'Gameweeks']
+
+######################################################
+# season names
+######################################################
+def season_start_year(season):
+    """
+    Function that returns the start year of a season given as 2024, '2024', '2024/25' or '2024-25'.
+    """
+    return int(str(season)[:4])
+
+def season_name(year):
+    """
+    Function that returns the FPL name of the season starting in year, e.g. 2024 -> '2024/25'.
+    """
+    return f'{year}/{(year + 1) % 100:02d}'
+
+def current_season(gameweeks_df):
+    """
+    Function that returns the start year of the season of the gameweeks (the year of the first deadline).
+    """
+    return int(pd.to_datetime(gameweeks_df['deadline_time'], utc=True).min().year)
+
+def with_element_code(fact_df, players_df):
+    """
+    Function that adds the player's code to the fact table: element ids are renumbered
+    every season, codes stay the same, so cross-season queries join on element_code.
+    """
+    codes = players_df.set_index('id')['code']
+    df = fact_df.copy()
+    df['element_code'] = df['element'].map(codes).astype('Int32')
+    return df
+
+######################################################
+# season store
+######################################################
+@instrument
+def save_season(tables, season, seasons_dir=SEASONS_DIR):
+    """
+    Function that writes {table name: DataFrame} as the partition of one season,
+    replacing that season only; the other seasons are left untouched.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    year = season_start_year(season)
+    for table, df in tables.items():
+        df = apply_schema(df, table)
+        df['season'] = year
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            root_path=os.path.join(seasons_dir, table),
+            partition_cols=['season'],
+            existing_data_behavior='delete_matching',
+            basename_template='part-{i}.parquet',
+        )
+    print(f"Season {season_name(year)} saved to {seasons_dir}")
+
+def list_seasons(table, seasons_dir=SEASONS_DIR):
+    """
+    Function that returns the start years of the seasons stored for table.
+    """
+    path = os.path.join(seasons_dir, table)
+    if not os.path.isdir(path):
+        return []
+    return sorted(int(name.split('=', 1)[1]) for name in os.listdir(path) if name.startswith('season='))
+
+def read_seasons(table, seasons=None, columns=None, seasons_dir=SEASONS_DIR):
+    """
+    Function that reads table for the requested seasons (all when None), loading only
+    `columns` plus 'season'. Other seasons' files are not opened.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(pa.schema([('season', pa.int16())]), flavor='hive')
+    dataset = ds.dataset(os.path.join(seasons_dir, table), format='parquet', partitioning=partitioning)
+    if columns is not None:
+        columns = list(columns) + (['season'] if 'season' not in columns else [])
+    filter = None
+    if seasons is not None:
+        filter = ds.field('season').isin([season_start_year(season) for season in seasons])
+    # Integer widths can differ between seasons (see Dtypes._int_dtype): read with the widest
+    fragments = list(dataset.get_fragments(filter=filter))
+    if fragments:
+        schema = pa.unify_schemas([f.physical_schema for f in fragments] + [partitioning.schema], promote_options='permissive')
+        dataset = ds.dataset([f.path for f in fragments], schema=schema, format='parquet',
+                             partitioning=partitioning, partition_base_dir=os.path.join(seasons_dir, table))
+    df = dataset.to_table(columns=columns, filter=filter).to_pandas()
+    return _restore_categories(df, table)
+
+######################################################
+# backfill
+######################################################
+def backfill(data_dir, seasons_dir=SEASONS_DIR):
+    """
+    Function that stores the season tables of a folder of pipeline CSVs as their season.
+    """
+    tables = {table: pd.read_csv(os.path.join(data_dir, f'{table}.csv')) for table in SEASON_TABLES}
+    players_path = os.path.join(data_dir, 'Players.csv')
+    if os.path.exists(players_path):
+        tables['Fact_Player'] = with_element_code(tables['Fact_Player'], pd.read_csv(players_path, usecols=['id', 'code']))
+    season = current_season(tables['Gameweeks'])
+    save_season(tables, season, seasons_dir)
+    return season
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != 'backfill':
+        sys.exit("usage: python FPL/Seasons.py backfill <data dir> [<data dir> ...]")
+    for folder in sys.argv[2:]:
+        backfill(folder)
@@ -0,0 +1,127 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+# Default archive folder next to the tables the run writes
+ARCHIVE_DIR = os.environ.get('FPL_ARCHIVE_DIR', os.path.join('data', 'archive'))
+
+
+def payload_key(url):
+    """
+    Function that returns the part of an API url after '/api/', without slashes,
+    e.g. 'https://.../api/element-summary/12/' -> 'element-summary/12'.
+    Snapshots are keyed this way so they replay against any API base.
+    """
+    path = url.split('?')[0]
+    if '/api/' in path:
+        path = path.split('/api/', 1)[1]
+    return path.strip('/')
+
+######################################################
+# content-addressed object store
+######################################################
+class ObjectStore:
+    """
+    Raw payloads stored once per content hash as objects/<2 chars>/<sha256>.json.gz.
+    """
+    def __init__(self, archive_dir=ARCHIVE_DIR):
+        self.objects_dir = os.path.join(archive_dir, 'objects')
+
+    def _path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f'{digest}.json.gz')
+
+    def put(self, body):
+        """
+        Stores body unless an identical payload is already archived; returns its hash.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest):
+        with gzip.open(self._path(digest), 'rb') as f:
+            return f.read()
+
+######################################################
+# snapshots
+######################################################
+class SnapshotWriter:
+    """
+    Records the payloads of one run. The manifest starts from the previous snapshot,
+    so runs that fetch only some players (incremental mode) still produce a complete snapshot.
+    """
+    def __init__(self, archive_dir=ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.store = ObjectStore(archive_dir)
+        self.snapshot_id = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        previous = latest_snapshot(archive_dir)
+        self.payloads = dict(load_manifest(previous, archive_dir)['payloads']) if previous else {}
+        self.new_objects = 0
+        self._lock = threading.Lock()
+
+    def add(self, url, body):
+        before = os.path.exists(self.store._path(hashlib.sha256(body).hexdigest()))
+        digest = self.store.put(body)
+        with self._lock:
+            self.payloads[payload_key(url)] = digest
+            self.new_objects += not before
+
+    def commit(self):
+        """
+        Writes snapshots/<id>.json and returns the snapshot id.
+        """
+        snapshots_dir = os.path.join(self.archive_dir, 'snapshots')
+        os.makedirs(snapshots_dir, exist_ok=True)
+        with self._lock:
+            manifest = {'id': self.snapshot_id, 'payloads': dict(sorted(self.payloads.items()))}
+        with open(os.path.join(snapshots_dir, f'{self.snapshot_id}.json'), 'w') as f:
+            json.dump(manifest, f)
+        print(f"Snapshot {self.snapshot_id} archived ({len(manifest['payloads'])} payloads, {self.new_objects} new)")
+        return self.snapshot_id
+
+
+class SnapshotReader:
+    """
+    Serves the payloads of an archived snapshot instead of the network (replay mode).
+    """
+    def __init__(self, snapshot_id='latest', archive_dir=ARCHIVE_DIR):
+        if snapshot_id == 'latest':
+            snapshot_id = latest_snapshot(archive_dir)
+            if snapshot_id is None:
+                raise FileNotFoundError(f"No snapshots in {archive_dir}")
+        self.snapshot_id = snapshot_id
+        self.payloads = load_manifest(snapshot_id, archive_dir)['payloads']
+        self.store = ObjectStore(archive_dir)
+
+    def get(self, url):
+        key = payload_key(url)
+        if key not in self.payloads:
+            raise KeyError(f"{key} is not in snapshot {self.snapshot_id}")
+        return self.store.get(self.payloads[key])
+
+
+def list_snapshots(archive_dir=ARCHIVE_DIR):
+    """
+    Function that returns the archived snapshot ids, oldest first.
+    """
+    snapshots_dir = os.path.join(archive_dir, 'snapshots')
+    if not os.path.isdir(snapshots_dir):
+        return []
+    return sorted(name[:-len('.json')] for name in os.listdir(snapshots_dir) if name.endswith('.json'))
+
+def latest_snapshot(archive_dir=ARCHIVE_DIR):
+    snapshots = list_snapshots(archive_dir)
+    return snapshots[-1] if snapshots else None
+
+def load_manifest(snapshot_id, archive_dir=ARCHIVE_DIR):
+    with open(os.path.join(archive_dir, 'snapshots', f'{snapshot_id}.json')) as f:
+        return json.load(f)
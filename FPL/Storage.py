@@ -0,0 +1,199 @@
+import os
+import shutil
+
+import pandas as pd
+
+from Dtypes import CAT, TABLE_SCHEMAS, apply_schema
+from Instrumentation import instrument
+
+# Tables written as one Parquet dataset per partition value, and the row order the
+# pipeline writes them in (restored on read, as partitions come back one after another)
+PARTITION_COLS = {'Fact_Player': ['GW']}
+PARTITION_ORDER = {'Fact_Player': ['element', 'GW']}
+
+PARQUET_DIR = os.path.join('data', 'parquet')
+
+
+def _restore_categories(df, table):
+    # Parquet only keeps the dictionary type of string columns, so integer categoricals
+    # such as team and element_type are re-created after reading
+    for col, dtype in TABLE_SCHEMAS.get(table, {}).items():
+        if dtype == CAT and col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(CAT)
+    return df
+
+######################################################
+# parquet output
+######################################################
+@instrument
+def save_to_parquet(df, table, parquet_dir=PARQUET_DIR):
+    """
+    Function that writes a table as typed Parquet: `<table>.parquet`, or a
+    `<table>/GW=<n>/` dataset for partitioned tables.
+    """
+    os.makedirs(parquet_dir, exist_ok=True)
+    df = apply_schema(df, table)
+    partition_cols = PARTITION_COLS.get(table)
+    if partition_cols:
+        path = os.path.join(parquet_dir, table)
+        # Replace the previous dataset so stale partitions do not linger
+        shutil.rmtree(path, ignore_errors=True)
+        df.to_parquet(path, engine='pyarrow', index=False, partition_cols=partition_cols)
+    else:
+        path = os.path.join(parquet_dir, f'{table}.parquet')
+        df.to_parquet(path, engine='pyarrow', index=False)
+    print(f"Data saved to Parquet: {path}")
+
+
+def save_partition(df, table, value, parquet_dir=PARQUET_DIR):
+    """
+    Function that rewrites one partition (e.g. GW=<n> of Fact_Player) of a partitioned
+    table and leaves the other partitions untouched.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    partition_col = PARTITION_COLS[table][0]
+    path = os.path.join(parquet_dir, table)
+    partition = os.path.join(path, f'{partition_col}={value}')
+    arrow_table = pa.Table.from_pandas(apply_schema(df, table).drop(columns=partition_col), preserve_index=False)
+    # Keep the column types of the existing partitions so the dataset stays readable as one table
+    others = [os.path.join(root, name) for root, _, names in os.walk(path) if root != partition
+              for name in names if name.endswith('.parquet')]
+    if others:
+        schema = pq.read_schema(others[0])
+        arrow_table = arrow_table.select(schema.names).cast(schema)
+    os.makedirs(partition + '.tmp', exist_ok=True)
+    pq.write_table(arrow_table, os.path.join(partition + '.tmp', 'part-0.parquet'))
+    shutil.rmtree(partition, ignore_errors=True)
+    os.replace(partition + '.tmp', partition)
+
+
+def _table_paths(table, data_dir):
+    # {format: path} of the copies of a table that exist on disk
+    parquet_dir = os.path.join(data_dir, 'parquet')
+    paths = {'parquet': os.path.join(parquet_dir, table) if table in PARTITION_COLS
+             else os.path.join(parquet_dir, f'{table}.parquet'),
+             'csv': os.path.join(data_dir, f'{table}.csv')}
+    return {fmt: path for fmt, path in paths.items() if os.path.exists(path)}
+
+
+def table_exists(table, data_dir='data', file_format=None):
+    """
+    Function that tells whether a table was written (in `file_format`, or in any format).
+    """
+    paths = _table_paths(table, data_dir)
+    return bool(paths) if file_format is None else file_format in paths
+
+
+def read_table(table, columns=None, gameweeks=None, data_dir='data', file_format=None):
+    """
+    Function that reads a table, loading only `columns` (and for Fact_Player only
+    the `gameweeks` partitions). Reads `file_format` ('csv' or 'parquet'), or by
+    default whichever copy was written last, so a stale copy never wins.
+    """
+    paths = _table_paths(table, data_dir)
+    if file_format is None:
+        file_format = max(paths, key=lambda fmt: os.path.getmtime(paths[fmt])) if paths else 'csv'
+    if file_format == 'csv':
+        df = pd.read_csv(os.path.join(data_dir, f'{table}.csv'), usecols=columns)
+        if gameweeks is not None and 'GW' in df.columns:
+            df = df[df['GW'].isin(list(gameweeks))]
+        return apply_schema(df, table)
+
+    parquet_dir = os.path.join(data_dir, 'parquet')
+    if table in PARTITION_COLS:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        # Declare the partition key types so GW comes back as an integer, not a dictionary
+        partitioning = ds.partitioning(pa.schema([(col, pa.int64()) for col in PARTITION_COLS[table]]), flavor='hive')
+        filters = [('GW', 'in', list(gameweeks))] if gameweeks is not None else None
+        arrow_table = pq.read_table(os.path.join(parquet_dir, table), columns=columns, filters=filters,
+                                    partitioning=partitioning)
+        df = arrow_table.to_pandas().sort_values(PARTITION_ORDER[table], kind='stable').reset_index(drop=True)
+        # The partition column comes back last; the pandas metadata has the written column order
+        pandas_metadata = arrow_table.schema.pandas_metadata or {}
+        order = [col['name'] for col in pandas_metadata.get('columns', []) if col['name'] in df.columns]
+        df = df[order + [col for col in df.columns if col not in order]]
+    else:
+        df = pd.read_parquet(os.path.join(parquet_dir, f'{table}.parquet'), engine='pyarrow', columns=columns)
+    # One typed schema whatever the storage format (e.g. the int64 partition column)
+    return apply_schema(_restore_categories(df, table), table)
+
+######################################################
+# chunked output
+######################################################
+class TableWriter:
+    """
+    Writes a table chunk by chunk to `<table>.csv` and/or Parquet (one row group, or
+    one file per partition, per chunk), so the whole table is never held in memory.
+    Output goes to temporary paths that replace the previous files on close().
+    """
+    def __init__(self, table, formats=('csv',), data_dir='data'):
+        self.table = table
+        self.formats = formats
+        self.data_dir = data_dir
+        self.parquet_dir = os.path.join(data_dir, 'parquet')
+        self.partition_cols = PARTITION_COLS.get(table)
+        self.rows = 0
+        self.chunks = 0
+        self._schema = None
+        self._parquet_writer = None
+        self.csv_path = os.path.join(data_dir, f'{table}.csv')
+        if self.partition_cols:
+            self.parquet_path = os.path.join(self.parquet_dir, table)
+        else:
+            self.parquet_path = os.path.join(self.parquet_dir, f'{table}.parquet')
+        if 'csv' in formats:
+            os.makedirs(data_dir, exist_ok=True)
+        if 'parquet' in formats:
+            os.makedirs(self.parquet_dir, exist_ok=True)
+            shutil.rmtree(self.parquet_path + '.tmp', ignore_errors=True)
+
+    def write(self, df):
+        df = apply_schema(df, self.table)
+        if 'csv' in self.formats:
+            df.to_csv(self.csv_path + '.tmp', mode='w' if self.chunks == 0 else 'a',
+                      header=self.chunks == 0, index=False)
+        if 'parquet' in self.formats:
+            self._write_parquet(df)
+        self.rows += len(df)
+        self.chunks += 1
+
+    def _write_parquet(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+        # Every chunk takes the schema of the first one (e.g. a nullable int column
+        # without nulls, or categories with a narrower index type), pandas metadata included
+        if self._schema is None:
+            self._schema = arrow_table.schema
+        arrow_table = arrow_table.cast(self._schema)
+        if self.partition_cols:
+            pq.write_to_dataset(arrow_table, self.parquet_path + '.tmp', partition_cols=self.partition_cols,
+                                basename_template=f'part-{self.chunks}-{{i}}.parquet')
+        else:
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.parquet_path + '.tmp', self._schema)
+            self._parquet_writer.write_table(arrow_table)
+
+    def close(self):
+        """
+        Function that moves the written chunks into place; without any chunk the previous output is kept.
+        """
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self.chunks == 0:
+            print(f"No rows written for {self.table}, keeping the previous output")
+            return
+        if 'csv' in self.formats:
+            os.replace(self.csv_path + '.tmp', self.csv_path)
+            print(f"Data saved to CSV file: {self.csv_path} ({self.rows} rows in {self.chunks} chunks)")
+        if 'parquet' in self.formats:
+            if os.path.isdir(self.parquet_path):
+                shutil.rmtree(self.parquet_path)
+            os.replace(self.parquet_path + '.tmp', self.parquet_path)
+            print(f"Data saved to Parquet: {self.parquet_path} ({self.rows} rows in {self.chunks} chunks)")
@@ -1,12 +1,16 @@
 import pandas as pd
 import datetime
 
+from Dtypes import apply_schema
+from Instrumentation import instrument
+
 # Get current date and time
 now = datetime.datetime.now()
 
 # Format the date and time as YYYY-MM-DD_HH-MM-SS for safe filename
 formatted_datetime = now.strftime("%Y-%m-%d_%H-%M-%S")
 
+@instrument
 def transform_fact_history(input_df):
     # Perform transformations
     input_df['kickoff_time'] = pd.to_datetime(input_df['kickoff_time'])
@@ -22,9 +26,33 @@ def transform_fact_history(input_df):
         'minutes': 'minutes_played'
     })
 
-    return input_df  # Return the transformed DataFrame
+    # Narrow ints, float32 stats and numeric expected_* columns (see Dtypes.py)
+    return apply_schema(input_df, 'Fact_Player')  # Return the transformed DataFrame
+
+
+# Chips that always get a column, even before anyone has played them
+KNOWN_CHIPS = ['bboost', '3xc', 'wildcard', 'freehit']
+
+def expand_chip_plays(chip_plays):
+    """
+    Turn a Series of chip_plays lists into a DataFrame with one integer column per
+    chip name (known chips first, any new chip the API returns after them).
+    """
+    exploded = chip_plays.explode().dropna()
+    exploded = exploded[exploded.map(type) == dict]
+    if exploded.empty:
+        counts = pd.DataFrame(index=chip_plays.index)
+    else:
+        chips = pd.DataFrame(exploded.tolist(), index=exploded.index)
+        counts = chips.pivot_table(index=chips.index, columns='chip_name', values='num_played', aggfunc='last')
+        counts.columns.name = None
+
+    extra_chips = sorted(c for c in counts.columns if c not in KNOWN_CHIPS)
+    counts = counts.reindex(index=chip_plays.index, columns=KNOWN_CHIPS + extra_chips)
+    return counts.fillna(0).astype('int64')
 
 
+@instrument
 def transform_gameweeks_data(df):
     # Select needed columns
     needed_columns = ['id', 'name', 'deadline_time', 'highest_score',
@@ -35,40 +63,26 @@ def transform_gameweeks_data(df):
     # Create a copy to avoid SettingWithCopyWarning
     df = df[needed_columns].copy()  
 
-    # Initialize chip columns to zero
-    df['bboost'] = 0
-    df['3xc'] = 0
-    df['wildcard'] = 0
-    df['freehit'] = 0
-
-    # Check for chip plays and update counts for each chip type
-    for index, row in df.iterrows():
-        if isinstance(row['chip_plays'], list) and row['chip_plays']:  # Ensure it's a list and not empty
-            for chip in row['chip_plays']:
-                chip_name = chip['chip_name']
-                if chip_name == 'bboost':
-                    df.at[index, 'bboost'] = chip['num_played']
-                elif chip_name == '3xc':
-                    df.at[index, '3xc'] = chip['num_played']
-                elif chip_name == 'wildcard':
-                    df.at[index, 'wildcard'] = chip['num_played']
-                elif chip_name == 'freehit':
-                    df.at[index, 'freehit'] = chip['num_played']
+    # Expand chip_plays ([{'chip_name': ..., 'num_played': ...}, ...]) into one column per chip
+    chip_counts = expand_chip_plays(df['chip_plays'])
+    df = pd.concat([df, chip_counts], axis=1)
 
     # Transform 'deadline_time' column
     df['deadline_time'] = pd.to_datetime(df['deadline_time'])
     df = df.rename(columns={'name': 'gw_name'})
     df.drop(columns=['chip_plays'], inplace=True)
-    return df
+    return apply_schema(df, 'Gameweeks')
 
 
+@instrument
 def transform_previous_season(df):
     # Convert costs from integer to float (e.g., 55 to 5.5)
     df['start_cost'] = df['start_cost'] / 10
     df['end_cost'] = df['end_cost'] / 10
 
-    return df  
+    return apply_schema(df, 'Player_history')
 
+@instrument
 def transform_players(players_df):
     # Select only the necessary columns
 
@@ -84,16 +98,19 @@ def transform_players(players_df):
     # Drop first_name and second_name columns
     players_df = players_df.drop(columns=['first_name', 'second_name'])
 
-    return players_df  # Return the transformed DataFrame for further processing if needed
+    # Narrow ints, float32 stats, categorical status/team/web_name (see Dtypes.py)
+    return apply_schema(players_df, 'Players')  # Return the transformed DataFrame for further processing if needed
 
+@instrument
 def transform_positions(positions_df):
     # Select only the necessary columns
     needed_columns = ['id', 'plural_name', 'plural_name_short', 'singular_name', 'singular_name_short','squad_select',
                       'squad_min_play', 'squad_max_play']
     df = positions_df[needed_columns].copy()  # Create a copy to avoid SettingWithCopyWarning
 
-    return df  
+    return apply_schema(df, 'Positions')
 
+@instrument
 def transform_teams(teams_df):
     # Select only the necessary columns
     needed_columns = [
@@ -108,4 +125,4 @@ def transform_teams(teams_df):
     # Rename the 'name' column to 'team_name' using .loc
     df.rename(columns={'name': 'team_name'}, inplace=True)
 
-    return df  # Return the transformed DataFrame for further processing if needed
+    return apply_schema(df, 'Teams')  # Return the transformed DataFrame for further processing if needed
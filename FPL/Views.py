@@ -0,0 +1,165 @@
+import html
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from FDR import build_fdr_matrix, enrich_fixtures
+from Instrumentation import instrument
+
+# Pre-rendered dashboard views, written by the pipeline next to the tables so the
+# Fixtures page serves them as they are:
+#   manifest.json            gameweek range and the next unfinished gameweek
+#   fixtures_GW<n>.html/json the fixture list of one gameweek
+#   fdr_GW<n>.html           the FDR table of the FDR_HORIZON gameweeks from n
+#   fdr.json                 FDR labels and difficulty of every unfinished fixture
+
+VIEWS_DIR = os.path.join('data', 'views')
+
+# Gameweeks shown in one FDR table
+FDR_HORIZON = 10
+
+# FDR value -> (background, font colour)
+FDR_COLORS = {
+    1: ('#257d5a', 'black'),
+    2: ('#00ff86', 'black'),
+    3: ('#ebebe4', 'black'),
+    4: ('#ff005a', 'white'),
+    5: ('#861d46', 'white'),
+}
+FDR_NAMES = {1: 'Very Easy', 2: 'Easy', 3: 'Medium', 4: 'Difficult', 5: 'Very Difficult'}
+
+FIXTURE_FIELDS = ['id', 'event', 'kickoff_time', 'local_date', 'local_hour', 'team_h', 'team_a', 'team_h_short',
+                  'team_a_short', 'team_h_score', 'team_a_score', 'finished', 'team_h_difficulty', 'team_a_difficulty']
+
+
+def fixtures_view(fixtures_df, teams_df):
+    """
+    Function that returns the fixtures with team names, short names and Europe/London kickoff columns.
+    """
+    df = enrich_fixtures(fixtures_df, teams_df).drop(columns=['pulse_id'], errors='ignore')
+    df['datetime'] = pd.to_datetime(df['kickoff_time'], utc=True)
+    london_time = df['datetime'].dt.tz_convert('Europe/London')
+    df['local_time'] = london_time.dt.strftime('%A %d %B %Y %H:%M')
+    df['local_date'] = london_time.dt.strftime('%A %d %B %Y')
+    df['local_hour'] = london_time.dt.strftime('%H:%M')
+    return df
+
+def next_gameweek(fixtures_df):
+    """
+    Function that returns the first gameweek with unfinished fixtures (the first gameweek when all are finished).
+    """
+    unfinished = fixtures_df.loc[fixtures_df['finished'] == False, 'event'].dropna()
+    return int(unfinished.min()) if not unfinished.empty else int(fixtures_df['event'].min())
+
+######################################################
+# HTML
+######################################################
+def fixture_list_html(matches):
+    """
+    Function that renders the fixtures of one gameweek (records sorted by kickoff), grouped
+    by London date, with the fixture-box classes styled on the Fixtures page.
+    """
+    parts = ['<div class="fixture-container">']
+    if not matches:
+        parts.append('<p style="text-align: center;">No fixtures in this gameweek.</p>')
+    date = None
+    for match in matches:
+        if match['local_date'] != date:
+            date = match['local_date']
+            parts.append(f'<h3 style="text-align: center;">{html.escape(str(date))}</h3>')
+        if match['finished']:
+            middle = f"<p class='score'>{int(match['team_h_score'])} - {int(match['team_a_score'])}</p>"
+        else:
+            middle = f"<p>vs</p><p class='kickoff'>Kickoff: {match['local_hour']}</p>"
+        parts.append(f"<div class='fixture-box'><p><b>{html.escape(str(match['team_h']))}</b></p>"
+                     f"<div>{middle}</div><p><b>{html.escape(str(match['team_a']))}</b></p></div>")
+    parts.append('</div>')
+    return '\n'.join(parts)
+
+def fdr_cells(labels, difficulty):
+    """
+    Function that renders every cell of the FDR matrices once, coloured by its difficulty.
+    """
+    cells = pd.DataFrame('', index=labels.index, columns=labels.columns, dtype=object)
+    for column in labels.columns:
+        colors = [FDR_COLORS.get(int(value) if pd.notna(value) else None, ('white', 'black'))
+                  for value in difficulty[column]]
+        cells[column] = [f'<td style="background-color: {background}; color: {font};">{html.escape(label)}</td>'
+                         for label, (background, font) in zip(labels[column], colors)]
+    return cells
+
+def fdr_table_html(cells, start_gw, horizon=FDR_HORIZON):
+    """
+    Function that renders the FDR table of the `horizon` gameweeks from start_gw (see fdr_cells).
+    """
+    columns = [f'GW{gw}' for gw in range(start_gw, start_gw + horizon) if f'GW{gw}' in cells.columns]
+    rows = ['<table><thead><tr><th></th>' + ''.join(f'<th>{c}</th>' for c in columns) + '</tr></thead><tbody>']
+    for team, row in zip(cells.index, cells[columns].to_numpy()):
+        rows.append(f'<tr><th>{html.escape(str(team))}</th>' + ''.join(row) + '</tr>')
+    rows.append('</tbody></table>')
+    return ''.join(rows)
+
+######################################################
+# build
+######################################################
+def build_views(fixtures_df, teams_df):
+    """
+    Function that returns every view as {file name: content} (see the list at the top).
+    """
+    view_df = fixtures_view(fixtures_df, teams_df)
+    gameweeks = sorted(int(gw) for gw in view_df['event'].dropna().unique())
+    upcoming = next_gameweek(view_df)
+    labels, difficulty = build_fdr_matrix(view_df)
+
+    views = {'manifest.json': json.dumps({
+        'first_gameweek': gameweeks[0], 'last_gameweek': gameweeks[-1], 'next_gameweek': upcoming,
+        'fdr_horizon': FDR_HORIZON,
+    })}
+    records = view_df.sort_values('datetime', kind='stable')[FIXTURE_FIELDS].astype(object)
+    by_gameweek = {}
+    for record in records.where(records.notna(), None).to_dict('records'):
+        if record['event'] is not None:
+            by_gameweek.setdefault(int(record['event']), []).append(record)
+    # Every gameweek of the range gets a view, also a round without fixtures (e.g. all postponed)
+    for gw in range(gameweeks[0], gameweeks[-1] + 1):
+        views[f'fixtures_GW{gw}.html'] = fixture_list_html(by_gameweek.get(gw, []))
+        views[f'fixtures_GW{gw}.json'] = json.dumps(by_gameweek.get(gw, []), default=str)
+    cells = fdr_cells(labels, difficulty)
+    for gw in range(upcoming, gameweeks[-1] + 1):
+        views[f'fdr_GW{gw}.html'] = fdr_table_html(cells, gw)
+    views['fdr.json'] = json.dumps({
+        'labels': labels.to_dict(orient='index'),
+        'difficulty': difficulty.astype(object).where(difficulty.notna(), None).to_dict(orient='index'),
+    })
+    return views
+
+@instrument
+def render_views(fixtures_df, teams_df, views_dir=VIEWS_DIR):
+    """
+    Function that writes the pre-rendered views, replacing the previous set as a whole.
+    """
+    views = build_views(fixtures_df, teams_df)
+    tmp_dir = views_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, content in views.items():
+        with open(os.path.join(tmp_dir, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+    shutil.rmtree(views_dir, ignore_errors=True)
+    os.replace(tmp_dir, views_dir)
+    print(f"Views saved to {views_dir} ({len(views)} files)")
+
+def read_views(views_dir=VIEWS_DIR):
+    """
+    Function that reads the manifest and the HTML views, or returns None when they were not rendered.
+    """
+    if not os.path.exists(os.path.join(views_dir, 'manifest.json')):
+        return None
+    views = {}
+    for name in os.listdir(views_dir):
+        if name.endswith('.html') or name == 'manifest.json':
+            with open(os.path.join(views_dir, name), encoding='utf-8') as f:
+                views[name] = f.read()
+    return views
@@ -113,10 +113,10 @@ CREATE TABLE IF NOT EXISTS gameweeks (
         threat FLOAT,
         ict_index FLOAT,
         starts INTEGER,
-        expected_goals VARCHAR(255),
-        expected_assists VARCHAR(255),
-        expected_goal_involvements VARCHAR(255),
-        expected_goals_conceded VARCHAR(255),
+        expected_goals FLOAT,
+        expected_assists FLOAT,
+        expected_goal_involvements FLOAT,
+        expected_goals_conceded FLOAT,
         price FLOAT,
         transfers_balance INTEGER,
         selected INTEGER,
@@ -126,8 +126,11 @@ CREATE TABLE IF NOT EXISTS gameweeks (
         FOREIGN KEY (element) REFERENCES players(id) ON DELETE CASCADE,
         FOREIGN KEY (opponent_team) REFERENCES teams(id) ON DELETE CASCADE,
         FOREIGN KEY (GW) REFERENCES gameweeks(id) ON DELETE CASCADE
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_fact_table_gw ON fact_table (GW);
 
-    CREATE TABLE fixtures (
+    CREATE TABLE IF NOT EXISTS fixtures (
         code VARCHAR(255),
         GW VARCHAR(255),
         finished BOOLEAN,
@@ -139,5 +142,8 @@ CREATE TABLE IF NOT EXISTS gameweeks (
         team_h VARCHAR(255),
         team_h_score INT,
         team_h_difficulty VARCHAR(255),
-        team_a_difficulty VARCHAR(255)
-    );
\ No newline at end of file
+        team_a_difficulty VARCHAR(255),
+        PRIMARY KEY(id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_fixtures_gw ON fixtures (GW);
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Benchmark: vectorized chip_plays expansion vs the previous iterrows loop, on a
+synthetic many-season events table. Also checks both give identical output
+for the four known chips.
+
+    python benchmarks/bench_chips.py --seasons 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'FPL'))
+from Dtypes import apply_schema
+from Transformation import transform_gameweeks_data
+
+CHIPS = ['bboost', '3xc', 'wildcard', 'freehit']
+
+def legacy_transform_gameweeks_data(df):
+    # Previous implementation, kept here as the reference output
+    needed_columns = ['id', 'name', 'deadline_time', 'highest_score',
+                      'average_entry_score', 'most_selected', 'most_transferred_in',
+                      'top_element', 'most_captained', 'most_vice_captained',
+                      'transfers_made', 'chip_plays']
+    df = df[needed_columns].copy()
+    df['bboost'] = 0
+    df['3xc'] = 0
+    df['wildcard'] = 0
+    df['freehit'] = 0
+    for index, row in df.iterrows():
+        if isinstance(row['chip_plays'], list) and row['chip_plays']:
+            for chip in row['chip_plays']:
+                chip_name = chip['chip_name']
+                if chip_name == 'bboost':
+                    df.at[index, 'bboost'] = chip['num_played']
+                elif chip_name == '3xc':
+                    df.at[index, '3xc'] = chip['num_played']
+                elif chip_name == 'wildcard':
+                    df.at[index, 'wildcard'] = chip['num_played']
+                elif chip_name == 'freehit':
+                    df.at[index, 'freehit'] = chip['num_played']
+    df['deadline_time'] = pd.to_datetime(df['deadline_time'])
+    df = df.rename(columns={'name': 'gw_name'})
+    df.drop(columns=['chip_plays'], inplace=True)
+    return df
+
+def make_events(seasons, extra_chips=()):
+    rng = random.Random(0)
+    rows = []
+    for i in range(seasons * 38):
+        played = rng.sample(CHIPS + list(extra_chips), rng.randint(0, len(CHIPS)))
+        rows.append({
+            'id': i + 1, 'name': f'Gameweek {i % 38 + 1}', 'deadline_time': '2024-08-16T17:30:00Z',
+            'highest_score': 100, 'average_entry_score': 50, 'most_selected': 1, 'most_transferred_in': 2,
+            'top_element': 3, 'most_captained': 4, 'most_vice_captained': 5, 'transfers_made': 1000,
+            'chip_plays': [{'chip_name': c, 'num_played': rng.randint(1, 10 ** 6)} for c in played],
+        })
+    return pd.DataFrame(rows)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    events = make_events(args.seasons)
+    # transform_gameweeks_data returns the typed table, so the reference output is typed the same way
+    expected = apply_schema(legacy_transform_gameweeks_data(events), 'Gameweeks')
+    result = transform_gameweeks_data(events)
+    pd.testing.assert_frame_equal(result, expected)
+    print(f"Output identical to the iterrows version ({len(events)} gameweeks)")
+
+    # New chip names are kept instead of being dropped
+    with_new_chip = transform_gameweeks_data(make_events(1, extra_chips=['manager']))
+    assert 'manager' in with_new_chip.columns
+
+    for name, func in (('iterrows', legacy_transform_gameweeks_data), ('vectorized', transform_gameweeks_data)):
+        best = min(_timed(func, events) for _ in range(args.repeat))
+        print(f"{name:>10}: {best * 1000:8.1f} ms")
+
+def _timed(func, events):
+    start = time.perf_counter()
+    func(events)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: dashboard cold start (fresh process: imports + first run) and rerun latency of
+every page, with the pipeline's pre-rendered views (FPL/Views.py) and without them (views
+rendered on the fly from the tables) for the Fixtures page. Also times the modules the pages now import lazily.
+
+    python benchmarks/bench_dashboard.py --reruns 10
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ['Home.py', os.path.join('pages', 'Fixtures.py'), os.path.join('pages', 'Player.py')]
+LAZY_MODULES = ['Optimizer', 'Live']
+
+def child(page, reruns):
+    # Runs in a fresh interpreter: everything the page imports is measured
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    import_seconds = time.perf_counter() - start
+
+    at = AppTest.from_file(os.path.join(ROOT_DIR, 'Data-vis', page), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    first_seconds = time.perf_counter() - start
+    assert not at.exception, at.exception
+
+    start = time.perf_counter()
+    for _ in range(reruns):
+        at.run()
+    rerun_seconds = (time.perf_counter() - start) / reruns
+
+    switch_seconds = None
+    if page.endswith('Fixtures.py'):
+        start = time.perf_counter()
+        at.sidebar.radio[0].set_value('Fixture Difficulty Rating').run()
+        switch_seconds = time.perf_counter() - start
+        assert not at.exception, at.exception
+
+    loaded = [name for name in LAZY_MODULES if name in sys.modules]
+    lazy_seconds = {}
+    for name in LAZY_MODULES:
+        if name not in sys.modules:
+            start = time.perf_counter()
+            __import__(name)
+            lazy_seconds[name] = time.perf_counter() - start
+    print(json.dumps({'import': import_seconds, 'first': first_seconds, 'rerun': rerun_seconds,
+                      'switch': switch_seconds, 'loaded': loaded, 'lazy': lazy_seconds}))
+
+def measure(page, data_dir, reruns):
+    env = dict(os.environ, FPL_DASHBOARD_DATA=data_dir)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, __file__, '--child', page, '--reruns', str(reruns)],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['cold'] = time.perf_counter() - start
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=os.path.join(ROOT_DIR, 'data'))
+    parser.add_argument('--reruns', type=int, default=10)
+    parser.add_argument('--child')
+    args = parser.parse_args()
+    if args.child:
+        sys.path.append(os.path.join(ROOT_DIR, 'FPL'))
+        child(args.child, args.reruns)
+        return
+
+    sys.path.append(os.path.join(ROOT_DIR, 'FPL'))
+    from Storage import read_table
+    from Views import render_views
+
+    work_dir = tempfile.mkdtemp(prefix='fpl-dashboard-')
+    data_dir = os.path.join(work_dir, 'data')
+    shutil.copytree(args.data_dir, data_dir, ignore=shutil.ignore_patterns('views', 'live', '*.db'))
+    render_views(read_table('Fixtures', data_dir=data_dir), read_table('Teams', data_dir=data_dir),
+                 os.path.join(data_dir, 'views'))
+
+    print(f"{'page':<20}{'views':<13}{'cold start':>11}{'first run':>11}{'rerun':>9}{'FDR switch':>12}")
+    for page in PAGES:
+        # Only the Fixtures page serves views; the others are measured once
+        for views in ('pre-rendered', 'on the fly') if page.endswith('Fixtures.py') else ('-',):
+            if views == 'on the fly':
+                shutil.rmtree(os.path.join(data_dir, 'views'))
+            result = measure(page, data_dir, args.reruns)
+            switch = f"{result['switch'] * 1000:9.0f} ms" if result['switch'] is not None else ''
+            print(f"{page:<20}{views:<13}{result['cold'] * 1000:8.0f} ms{result['first'] * 1000:8.0f} ms"
+                  f"{result['rerun'] * 1000:6.0f} ms{switch:>12}")
+        lazy = ', '.join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in result['lazy'].items())
+        print(f"  not imported by the page: {lazy or '-'}")
+    shutil.rmtree(work_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: upcoming fixture difficulty for every player, per-query filtering of the
+fixtures (previous Optimizer code) vs FDR.DifficultyIndex prefix sums.
+
+    python benchmarks/bench_difficulty.py --data-dir data --queries 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'FPL'))
+from FDR import DifficultyIndex, add_fixture_difficulty
+
+HORIZONS = (1, 2, 5, 10)
+
+def legacy_upcoming_difficulty(fixtures_df, gameweek, horizon):
+    # Previous Optimizer.upcoming_difficulty: filter the fixtures on every query
+    home = fixtures_df[['event', 'team_h', 'team_h_difficulty']].set_axis(['event', 'team', 'difficulty'], axis=1)
+    away = fixtures_df[['event', 'team_a', 'team_a_difficulty']].set_axis(['event', 'team', 'difficulty'], axis=1)
+    long_df = pd.concat([home, away], ignore_index=True)
+    window = long_df[(long_df['event'] >= gameweek) & (long_df['event'] < gameweek + horizon)]
+    return window.groupby('team')['difficulty'].mean()
+
+def with_double_and_blank(fixtures_df):
+    # Move a fixture of GW 5 into GW 6 so both teams get a blank and a double gameweek
+    df = fixtures_df.copy()
+    df.loc[df.index[df['event'] == 5][0], 'event'] = 6
+    return df
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=os.path.join(ROOT_DIR, 'data'))
+    parser.add_argument('--queries', type=int, default=200, help='(start gameweek, horizon) queries per method')
+    args = parser.parse_args()
+
+    fixtures_df = with_double_and_blank(pd.read_csv(os.path.join(args.data_dir, 'Fixtures.csv')))
+    players_df = pd.read_csv(os.path.join(args.data_dir, 'Players.csv'), usecols=['id', 'team'])
+    index = DifficultyIndex(fixtures_df)
+
+    # Same values as the per-query filter, for every start gameweek and horizon
+    for gameweek in range(1, index.max_gameweek + 2):
+        for horizon in HORIZONS:
+            expected = players_df['team'].map(legacy_upcoming_difficulty(fixtures_df, gameweek, horizon))
+            actual = index.mean(players_df['team'], gameweek, horizon)
+            assert np.allclose(expected.to_numpy(dtype=float), actual, equal_nan=True), (gameweek, horizon)
+
+    rng = np.random.default_rng(0)
+    queries = [(int(gw), HORIZONS[i % len(HORIZONS)]) for i, gw in enumerate(rng.integers(1, 39, args.queries))]
+
+    start = time.perf_counter()
+    for gameweek, horizon in queries:
+        players_df['team'].map(legacy_upcoming_difficulty(fixtures_df, gameweek, horizon))
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = DifficultyIndex(fixtures_df)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for gameweek, horizon in queries:
+        index.mean(players_df['team'].to_numpy(), gameweek, horizon)
+    indexed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    joined = add_fixture_difficulty(players_df, index, 10)
+    join = time.perf_counter() - start
+
+    print(f"{len(players_df)} players, {args.queries} queries")
+    print(f"filter per query   {legacy * 1000:8.1f} ms")
+    print(f"prefix-sum index   {indexed * 1000:8.1f} ms (+{build * 1000:.1f} ms build)  x{legacy / indexed:.0f}")
+    print(f"join all horizons  {join * 1000:8.1f} ms -> {[c for c in joined.columns if c.startswith('fdr_')]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Memory of the data/ tables with pandas' default dtypes vs the dtype registry (FPL/Dtypes.py).
+
+    python benchmarks/bench_dtypes.py --data-dir data --copies 5
+
+--copies stacks the tables N times to mimic several seasons kept in memory.
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'FPL'))
+from Dtypes import TABLE_SCHEMAS, apply_schema, memory_usage_mb
+
+XG_COLUMNS = ['expected_goals', 'expected_assists', 'expected_goal_involvements', 'expected_goals_conceded']
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=os.path.join(ROOT_DIR, 'data'))
+    parser.add_argument('--copies', type=int, default=1)
+    args = parser.parse_args()
+
+    total_before = total_after = 0.0
+    print(f"{'table':<16}{'rows':>8}{'before MB':>12}{'after MB':>11}{'saved':>8}")
+    for table in TABLE_SCHEMAS:
+        path = os.path.join(args.data_dir, f'{table}.csv')
+        if not os.path.exists(path):
+            continue
+        before = pd.concat([pd.read_csv(path)] * args.copies, ignore_index=True)
+        if table == 'Fact_Player':
+            # The API sends expected_* as strings and the pipeline used to keep them that way
+            for col in XG_COLUMNS:
+                before[col] = before[col].map('{:.2f}'.format)
+        after = apply_schema(before, table)
+
+        # Same values after the cast (float32 compared at its own precision)
+        for col in XG_COLUMNS:
+            if col in before.columns:
+                assert (pd.to_numeric(before[col]).astype('float32') == after[col]).all(), col
+        assert len(after) == len(before)
+
+        mb_before, mb_after = memory_usage_mb(before), memory_usage_mb(after)
+        total_before += mb_before
+        total_after += mb_after
+        print(f"{table:<16}{len(before):>8}{mb_before:>12.2f}{mb_after:>11.2f}{1 - mb_after / mb_before:>8.0%}")
+    print(f"{'total':<16}{'':>8}{total_before:>12.2f}{total_after:>11.2f}{1 - total_after / total_before:>8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: fixtures enrichment + FDR matrix, previous per-row lambda/iterrows code
+vs FDR.enrich_fixtures/build_fdr_matrix, on synthetic multi-season fixtures.
+
+    python benchmarks/bench_fdr.py --seasons 1 5 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'FPL'))
+from FDR import build_fdr_matrix, enrich_fixtures
+
+def legacy_fdr(df_fixtures, df_teams):
+    # Previous dashboard code
+    df_fixtures = df_fixtures.copy()
+    team_name_mapping = pd.Series(df_teams.team_name.values, index=df_teams.id).to_dict()
+    team_short_name_mapping = pd.Series(df_teams.short_name.values, index=df_teams.id).to_dict()
+    df_fixtures['team_a'] = df_fixtures['team_a'].replace(team_name_mapping)
+    df_fixtures['team_h'] = df_fixtures['team_h'].replace(team_name_mapping)
+    df_fixtures['team_a_short'] = df_fixtures['team_a'].map(lambda x: team_short_name_mapping[df_teams[df_teams.team_name == x].id.values[0]] if x in team_name_mapping.values() else None)
+    df_fixtures['team_h_short'] = df_fixtures['team_h'].map(lambda x: team_short_name_mapping[df_teams[df_teams.team_name == x].id.values[0]] if x in team_name_mapping.values() else None)
+
+    upcoming_gameweeks = df_fixtures[df_fixtures['finished'] == False]
+    teams = upcoming_gameweeks['team_a_short'].unique()
+    formatted_gameweeks = [f'GW{gw}' for gw in upcoming_gameweeks['event'].unique()]
+    fdr_matrix = pd.DataFrame(index=teams, columns=formatted_gameweeks)
+    fdr_values = {}
+    for index, row in upcoming_gameweeks.iterrows():
+        gameweek = f'GW{row["event"]}'
+        fdr_matrix.at[row['team_a_short'], gameweek] = f"{row['team_h_short']} (A)"
+        fdr_matrix.at[row['team_h_short'], gameweek] = f"{row['team_a_short']} (H)"
+        fdr_values[(row['team_a_short'], gameweek)] = row['team_a_difficulty']
+        fdr_values[(row['team_h_short'], gameweek)] = row['team_h_difficulty']
+    return fdr_matrix.astype(str), fdr_values
+
+def new_fdr(df_fixtures, df_teams):
+    return build_fdr_matrix(enrich_fixtures(df_fixtures, df_teams))
+
+def make_fixtures(seasons, teams=20):
+    # Round-robin style fixtures, numbered across seasons; nothing finished so the whole set is used
+    rng = random.Random(0)
+    rows = []
+    for season in range(seasons):
+        for gw in range(1, 39):
+            order = rng.sample(range(1, teams + 1), teams)
+            for i in range(0, teams, 2):
+                rows.append({'event': season * 38 + gw, 'finished': False, 'team_h': order[i],
+                             'team_a': order[i + 1], 'team_h_difficulty': rng.randint(1, 5),
+                             'team_a_difficulty': rng.randint(1, 5)})
+    return pd.DataFrame(rows)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 5, 20])
+    args = parser.parse_args()
+
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+    df_teams = pd.read_csv(os.path.join(data_dir, 'Teams.csv'))
+
+    for seasons in args.seasons:
+        fixtures = make_fixtures(seasons)
+        old_labels, old_values = legacy_fdr(fixtures, df_teams)
+        labels, difficulty = new_fdr(fixtures, df_teams)
+        # Same cells and difficulties (single fixture per team and gameweek here)
+        assert labels.sort_index().equals(old_labels.sort_index()[labels.columns])
+        assert all(difficulty.at[team, gw] == value for (team, gw), value in old_values.items())
+
+        timings = {}
+        for name, func in (('legacy', legacy_fdr), ('vectorized', new_fdr)):
+            start = time.perf_counter()
+            func(fixtures, df_teams)
+            timings[name] = time.perf_counter() - start
+        print(f"{seasons:>3} seasons ({len(fixtures):>5} fixtures): legacy {timings['legacy'] * 1000:8.1f} ms, "
+              f"vectorized {timings['vectorized'] * 1000:6.1f} ms, x{timings['legacy'] / timings['vectorized']:.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmark: sequential vs concurrent element-summary fetching against a local stub server.
+
+    python benchmarks/bench_fetch.py --players 660 --latency 0.02 --workers 1 4 8 16
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+from stub_server import start_stub_server
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=660)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every response')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    server, base = start_stub_server(players=args.players, latency=args.latency)
+    os.environ['FPL_API_BASE'] = base
+    os.environ['FPL_CACHE'] = '0'  # every run must hit the server
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'FPL'))
+    import pandas as pd
+    from Functions import load_player_history
+
+    players_df = pd.DataFrame({'id': range(1, args.players + 1)})
+    baseline = None
+    print(f"{args.players} players, {args.latency * 1000:.0f} ms latency per request")
+    for workers in args.workers:
+        start = time.perf_counter()
+        current_df, previous_df = load_player_history(players_df, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        # Ordering must match the sequential loop
+        assert current_df['element'].is_monotonic_increasing
+        baseline = baseline or elapsed
+        print(f"workers={workers:>3}  {elapsed:7.2f}s  rows={len(current_df):>6}  speedup x{baseline / elapsed:.1f}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
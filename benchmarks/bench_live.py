@@ -0,0 +1,90 @@
+"""
+Benchmark: keeping Fact_Player current during a live gameweek with Live.LiveUpdater
+(conditional polls of fixtures, refetch of the players of changed fixtures only) vs
+rerunning main.py after every update, against the local stub server.
+
+    python benchmarks/bench_live.py --players 660 [--fixtures 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from stub_server import start_stub_server
+
+def run_pipeline(work_dir):
+    import main
+    os.makedirs(work_dir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.main()
+    finally:
+        os.chdir(cwd)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=660)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every response')
+    parser.add_argument('--fixtures', type=int, default=None,
+                        help='fixtures played at the same time (default: every fixture of the gameweek, to full time)')
+    args = parser.parse_args()
+
+    server, base = start_stub_server(players=args.players, latency=args.latency)
+    os.environ.update(FPL_API_BASE=base, FPL_CACHE='0', FPL_ARCHIVE='0', FPL_OUTPUT_FORMAT='both')
+    sys.path.append(ROOT_DIR)
+    sys.path.append(os.path.join(ROOT_DIR, 'FPL'))
+    import pandas as pd
+    from Live import LiveUpdater, poll_interval, read_feed
+    from Storage import read_table
+
+    work_dir = tempfile.mkdtemp(prefix='fpl-live-')
+    live_dir, full_dir = os.path.join(work_dir, 'live'), os.path.join(work_dir, 'full')
+    run_pipeline(live_dir)
+    gameweek = server.api.current_gw + 1
+
+    updater = LiveUpdater(data_dir=os.path.join(live_dir, 'data'), formats=('csv', 'parquet'))
+    server.reset_counters()
+    start = time.perf_counter()
+    print(f"{args.players} players, {args.fixtures or 'all'} fixtures of GW{gameweek} in play")
+    for minutes in (None, None, 30, 60, 90, 90):
+        if minutes is not None:
+            server.api.play(gameweek, minutes, args.fixtures)
+            server.invalidate()
+        requests_before = server.request_count
+        events = updater.poll()
+        print(f"  {'before kickoff' if minutes is None else f'minute {minutes}':>14}: {len(events):4} changes, "
+              f"{server.request_count - requests_before:4} requests, next poll in {poll_interval(updater.fixtures):.0f}s")
+    live_seconds = time.perf_counter() - start
+    live_requests, live_bytes = server.request_count, server.bytes_sent
+
+    # The same updates as full reruns (the first poll only sets the baseline)
+    server.reset_counters()
+    start = time.perf_counter()
+    for _ in range(4):
+        run_pipeline(full_dir)
+    full_seconds = time.perf_counter() - start
+    full_requests, full_bytes = server.request_count, server.bytes_sent
+
+    # The live tables must match a full rebuild
+    expected = pd.read_csv(os.path.join(full_dir, 'data', 'Fact_Player.csv'))
+    pd.testing.assert_frame_equal(pd.read_csv(os.path.join(live_dir, 'data', 'Fact_Player.csv')), expected)
+    from_parquet = read_table('Fact_Player', data_dir=os.path.join(live_dir, 'data'))
+    assert len(from_parquet) == len(expected)
+    assert from_parquet['total_points'].sum() == expected['total_points'].sum()
+    assert read_feed(gameweek, data_dir=os.path.join(live_dir, 'data'))['seq'].is_monotonic_increasing
+
+    print(f"live updater  {live_seconds:6.2f}s  {live_requests:5} requests  {live_bytes / 1024:8.0f} KB")
+    print(f"full reruns   {full_seconds:6.2f}s  {full_requests:5} requests  {full_bytes / 1024:8.0f} KB")
+    server.shutdown()
+    shutil.rmtree(work_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Offline benchmark of main() against the local FPL stand-in (benchmarks/stub_server.py).
+Reports wall time, request count, bytes downloaded, peak RSS and per-stage timings.
+
+    python benchmarks/bench_pipeline.py --players 660 --latency 0.02 --runs 3
+    python benchmarks/bench_pipeline.py --recorded recordings/2024-10-01 --json bench.json
+    FPL_INCREMENTAL=1 python benchmarks/bench_pipeline.py --runs 2 --cache
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from stub_server import start_stub_server
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=660)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every response')
+    parser.add_argument('--recorded', help='serve recorded payloads from this directory instead of synthetic data')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--cache', action='store_true', help='keep the HTTP response cache between runs')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    server, base = start_stub_server(players=args.players, latency=args.latency, recorded=args.recorded)
+    work_dir = tempfile.mkdtemp(prefix='fpl-bench-')
+    os.environ['FPL_API_BASE'] = base
+    os.environ['FPL_CACHE_DIR'] = os.path.join(work_dir, 'http-cache')
+    os.environ['FPL_ARCHIVE_DIR'] = os.path.join(work_dir, 'archive')
+    if not args.cache:
+        os.environ['FPL_CACHE'] = '0'
+
+    # main.py writes to ./data, so run it inside a scratch folder
+    os.chdir(work_dir)
+    sys.path.insert(0, ROOT_DIR)
+    import main as pipeline
+
+    results = []
+    for run in range(1, args.runs + 1):
+        server.reset_counters()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings = pipeline.main()
+        wall = time.perf_counter() - start
+        results.append({
+            'run': run,
+            'wall_seconds': round(wall, 3),
+            'requests': server.request_count,
+            'requests_by_endpoint': dict(server.endpoint_counts),
+            'bytes_downloaded': server.bytes_sent,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'stage_seconds': {name: round(seconds, 3) for name, seconds in timings.items()},
+        })
+
+    server.shutdown()
+
+    for result in results:
+        print(f"run {result['run']}: {result['wall_seconds']:.2f}s wall, {result['requests']} requests "
+              f"({result['bytes_downloaded'] / 1e6:.1f} MB), peak RSS {result['peak_rss_mb']:.0f} MB")
+        slowest = sorted(result['stage_seconds'].items(), key=lambda item: -item[1])
+        print("    " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in slowest))
+
+    if args.json:
+        with open(os.path.join(ROOT_DIR, args.json) if not os.path.isabs(args.json) else args.json, 'w') as f:
+            json.dump({'players': args.players, 'latency': args.latency, 'runs': results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: Projection.project_points (players x gameweeks x fixtures in one array expression)
+vs the same model evaluated with per-player, per-fixture loops, on data/ with a double and a
+blank gameweek added.
+
+    python benchmarks/bench_projection.py --horizon 10 --sample 50
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'FPL'))
+from Storage import read_table
+from Projection import (ASSIST_POINTS, CLEAN_SHEET_POINTS, CONCEDED_POINTS, GOAL_POINTS, RED_POINTS,
+                        SAVE_POINTS, YELLOW_POINTS, player_rates, project_points)
+
+def loop_projection(players_df, rates, fixtures_df, teams_df, gameweeks):
+    # Reference implementation: one player, one fixture at a time
+    teams = teams_df.set_index('id')
+    attack_mean = (teams['strength_attack_home'] + teams['strength_attack_away']) / 2
+    defence_mean = (teams['strength_defence_home'] + teams['strength_defence_away']) / 2
+    result = {}
+    for i, player in players_df.iterrows():
+        r = rates.loc[i]
+        position = int(player['element_type'])
+        row = []
+        for gw in gameweeks:
+            total = 0.0
+            for _, fixture in fixtures_df[fixtures_df['event'] == gw].iterrows():
+                if int(fixture['team_h']) == int(player['team']):
+                    own, opp, venue, opp_venue = teams.loc[fixture['team_h']], teams.loc[fixture['team_a']], 'home', 'away'
+                elif int(fixture['team_a']) == int(player['team']):
+                    own, opp, venue, opp_venue = teams.loc[fixture['team_a']], teams.loc[fixture['team_h']], 'away', 'home'
+                else:
+                    continue
+                team_id = int(player['team'])
+                attack = own[f'strength_attack_{venue}'] / attack_mean[team_id] * defence_mean.mean() / opp[f'strength_defence_{opp_venue}']
+                defence = defence_mean[team_id] / own[f'strength_defence_{venue}'] * opp[f'strength_attack_{opp_venue}'] / attack_mean.mean()
+                share = r['minutes'] / 90
+                conceded = r['xgc90'] * defence
+                total += (r['p_play'] + r['p_60']
+                          + share * (r['bonus90'] + SAVE_POINTS * r['saves90'] + YELLOW_POINTS * r['yc90'] + RED_POINTS * r['rc90'])
+                          + share * attack * (GOAL_POINTS[position] * r['xg90'] + ASSIST_POINTS * r['xa90'])
+                          + CLEAN_SHEET_POINTS[position] * r['p_60'] * math.exp(-conceded)
+                          + CONCEDED_POINTS[position] * share * conceded)
+            row.append(total)
+        result[player['id']] = row
+    return pd.DataFrame.from_dict(result, orient='index', columns=gameweeks)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=os.path.join(ROOT_DIR, 'data'))
+    parser.add_argument('--horizon', type=int, default=10)
+    parser.add_argument('--sample', type=int, default=50, help='players checked against the loop version')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    players, fact, teams, fixtures = (read_table(name, data_dir=args.data_dir) for name in ('Players', 'Fact_Player', 'Teams', 'Fixtures'))
+    start_gw = int(fixtures.loc[fixtures['finished'] == False, 'event'].min())
+    # Postpone one fixture of the second upcoming gameweek into the third: a blank and a double gameweek
+    fixtures.loc[fixtures.index[fixtures['event'] == start_gw + 1][0], 'event'] = start_gw + 2
+    gameweeks = list(range(start_gw, start_gw + args.horizon))
+
+    projection = project_points(players, fact, teams, fixtures, start_gw, args.horizon)
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        project_points(players, fact, teams, fixtures, start_gw, args.horizon)
+    vectorized = (time.perf_counter() - start) / args.runs
+
+    sample = players.sample(min(args.sample, len(players)), random_state=0)
+    # The loop version leaves out availability (chance of playing, players who left)
+    sample = sample.assign(chance_of_playing_next_round=np.nan, status='a')
+    rates = player_rates(fact, sample)
+    start = time.perf_counter()
+    expected = loop_projection(sample, rates, fixtures, teams, gameweeks)
+    loop = (time.perf_counter() - start) / len(sample) * len(players)
+
+    actual = project_points(sample, fact, teams, fixtures, start_gw, args.horizon)
+    assert np.allclose(actual.to_numpy(), expected.to_numpy()), 'vectorized and loop projections differ'
+    assert projection.shape == (len(players), args.horizon)
+
+    print(f"{len(players)} players x {args.horizon} gameweeks")
+    print(f"vectorized          {vectorized * 1000:8.1f} ms")
+    print(f"per-player loops    {loop * 1000:8.1f} ms (extrapolated from {len(sample)} players)  x{loop / vectorized:.0f}")
+
+if __name__ == "__main__":
+    main()
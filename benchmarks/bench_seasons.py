@@ -0,0 +1,59 @@
+"""
+Benchmark: a cross-season query (one player's points per gameweek over the last seasons)
+re-reading every season's Fact_Player CSV vs Seasons.read_seasons on the partitioned store.
+The seasons are copies of the current data/Fact_Player.csv.
+
+    python benchmarks/bench_seasons.py --seasons 10 --last 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'FPL'))
+from Seasons import read_seasons, save_season, with_element_code
+
+COLUMNS = ['element_code', 'GW', 'total_points']
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=os.path.join(ROOT_DIR, 'data'))
+    parser.add_argument('--seasons', type=int, default=10, help='seasons in the store')
+    parser.add_argument('--last', type=int, default=5, help='seasons the query needs')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='fpl-seasons-')
+    fact_df = with_element_code(pd.read_csv(os.path.join(args.data_dir, 'Fact_Player.csv')),
+                                pd.read_csv(os.path.join(args.data_dir, 'Players.csv'), usecols=['id', 'code']))
+    code = fact_df['element_code'].mode()[0]
+    years = list(range(2024 - args.seasons + 1, 2025))
+    for year in years:
+        fact_df.to_csv(os.path.join(work_dir, f'Fact_Player_{year}.csv'), index=False)
+        save_season({'Fact_Player': fact_df}, year, os.path.join(work_dir, 'seasons'))
+    wanted = years[-args.last:]
+
+    start = time.perf_counter()
+    frames = [pd.read_csv(os.path.join(work_dir, f'Fact_Player_{year}.csv')).assign(season=year) for year in years]
+    everything = pd.concat(frames, ignore_index=True)
+    legacy = everything[(everything['season'].isin(wanted)) & (everything['element_code'] == code)]
+    csv_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = read_seasons('Fact_Player', seasons=wanted, columns=COLUMNS, seasons_dir=os.path.join(work_dir, 'seasons'))
+    trajectory = df[df['element_code'] == code]
+    store_seconds = time.perf_counter() - start
+
+    assert len(trajectory) == len(legacy)
+    assert trajectory['total_points'].sum() == legacy['total_points'].sum()
+    print(f"{args.seasons} seasons stored, query over {args.last}, {len(trajectory)} rows for player {code}")
+    print(f"re-read all CSVs   {csv_seconds * 1000:8.1f} ms")
+    print(f"season store       {store_seconds * 1000:8.1f} ms  x{csv_seconds / store_seconds:.0f}")
+    shutil.rmtree(work_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: peak memory of loading player statistics all at once (load_player_history, then
+transform, then write) vs streaming them in batches (iter_player_history + TableWriter),
+for growing player counts, against the local stub server.
+
+    python benchmarks/bench_stream.py --players 660 1320 2640 --batch 100
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from stub_server import start_stub_server
+
+def measure(function):
+    # Peak of the memory allocated while function runs (numpy buffers are traced too)
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 ** 2, elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, nargs='+', default=[660, 1320, 2640])
+    parser.add_argument('--batch', type=int, default=100)
+    parser.add_argument('--current-gw', type=int, default=38)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    server, base = start_stub_server(players=max(args.players), latency=0.0, current_gw=args.current_gw)
+    os.environ['FPL_API_BASE'] = base
+    os.environ['FPL_CACHE'] = '0'
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'FPL'))
+    import pandas as pd
+    from Functions import iter_player_history, load_player_history
+    from Storage import TableWriter
+    from Transformation import transform_fact_history, transform_previous_season
+
+    print(f"{args.current_gw} gameweeks, batches of {args.batch} players")
+    for players in args.players:
+        players_df = pd.DataFrame({'id': range(1, players + 1)})
+        full_dir = tempfile.mkdtemp(prefix='fpl-full-')
+        stream_dir = tempfile.mkdtemp(prefix='fpl-stream-')
+
+        def full():
+            current_df, previous_df = load_player_history(players_df, max_workers=args.workers)
+            transform_fact_history(current_df).to_csv(os.path.join(full_dir, 'Fact_Player.csv'), index=False)
+            transform_previous_season(previous_df).to_csv(os.path.join(full_dir, 'Player_history.csv'), index=False)
+
+        def stream():
+            fact_writer = TableWriter('Fact_Player', data_dir=stream_dir)
+            history_writer = TableWriter('Player_history', data_dir=stream_dir)
+            for current_df, previous_df in iter_player_history(players_df, max_workers=args.workers, batch_size=args.batch):
+                fact_writer.write(transform_fact_history(current_df))
+                history_writer.write(transform_previous_season(previous_df))
+            fact_writer.close()
+            history_writer.close()
+
+        full_mb, full_seconds = measure(full)
+        stream_mb, stream_seconds = measure(stream)
+        for table in ('Fact_Player', 'Player_history'):
+            expected = pd.read_csv(os.path.join(full_dir, f'{table}.csv'))
+            actual = pd.read_csv(os.path.join(stream_dir, f'{table}.csv'))
+            pd.testing.assert_frame_equal(actual, expected)
+        print(f"players={players:>5}  all at once {full_mb:7.1f} MB {full_seconds:5.2f}s   "
+              f"streaming {stream_mb:7.1f} MB {stream_seconds:5.2f}s")
+        shutil.rmtree(full_dir)
+        shutil.rmtree(stream_dir)
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
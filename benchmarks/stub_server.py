@@ -0,0 +1,342 @@
+"""
+Local stand-in for the FPL API. Serves bootstrap-static, fixtures and
+element-summary/{id} from a synthetic season or from recorded JSON payloads,
+with a configurable latency per request.
+
+    python benchmarks/stub_server.py --players 660 --latency 0.05 --port 8000
+    python benchmarks/stub_server.py --recorded recordings/2024-10-01 --port 8000
+    python benchmarks/stub_server.py --record recordings/2024-10-01   # save live payloads
+
+Point the pipeline at it with FPL_API_BASE=http://127.0.0.1:8000/api
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+######################################################
+# synthetic payloads
+######################################################
+STAT_FIELDS = ['goals_scored', 'assists', 'clean_sheets', 'goals_conceded', 'own_goals', 'penalties_saved',
+               'penalties_missed', 'yellow_cards', 'red_cards', 'saves', 'bonus']
+DECIMAL_FIELDS = ['influence', 'creativity', 'threat', 'ict_index', 'expected_goals', 'expected_assists',
+                  'expected_goal_involvements', 'expected_goals_conceded']
+# id, plural_name, short name, singular_name, squad_select, squad_min_play, squad_max_play
+POSITIONS = [
+    (1, 'Goalkeepers', 'GKP', 'Goalkeeper', 2, 1, 1),
+    (2, 'Defenders', 'DEF', 'Defender', 5, 3, 5),
+    (3, 'Midfielders', 'MID', 'Midfielder', 5, 2, 5),
+    (4, 'Forwards', 'FWD', 'Forward', 3, 1, 3),
+]
+
+
+def kickoff(gw, hour):
+    # One gameweek per week from mid August
+    day = 16 + 7 * (gw - 1)
+    month, day = 8 + (day - 1) // 30, (day - 1) % 30 + 1
+    year = 2024 + (month - 1) // 12
+    return f'{year}-{(month - 1) % 12 + 1:02d}-{day:02d}T{hour:02d}:00:00Z'
+
+
+class SyntheticAPI:
+    """
+    A synthetic season: n_teams teams, n_players players and a double round robin,
+    with gameweeks up to current_gw finished.
+    """
+    def __init__(self, n_players=660, n_teams=20, current_gw=10, seed=0):
+        self.n_players = n_players
+        self.n_teams = n_teams
+        self.current_gw = current_gw
+        self.rng = random.Random(seed)
+        self.fixtures = self._make_fixtures()
+        self.players = [self._make_player(i) for i in range(1, n_players + 1)]
+
+    def _make_fixtures(self):
+        teams = list(range(1, self.n_teams + 1))
+        rounds = []
+        # Circle method: every team plays every other team once per half season
+        for _ in range(self.n_teams - 1):
+            rounds.append([(teams[i], teams[-1 - i]) for i in range(self.n_teams // 2)])
+            teams = [teams[0], teams[-1]] + teams[1:-1]
+        rounds += [[(a, h) for h, a in matches] for matches in rounds]
+
+        fixtures, fixture_id = [], 1
+        for gw, matches in enumerate(rounds, start=1):
+            finished = gw <= self.current_gw
+            for team_h, team_a in matches:
+                fixtures.append({
+                    'code': 2400000 + fixture_id, 'event': gw, 'finished': finished,
+                    'finished_provisional': finished, 'id': fixture_id, 'kickoff_time': kickoff(gw, 14),
+                    'minutes': 90 if finished else 0, 'provisional_start_time': False, 'started': finished,
+                    'team_a': team_a, 'team_a_score': self.rng.randint(0, 3) if finished else None,
+                    'team_h': team_h, 'team_h_score': self.rng.randint(0, 3) if finished else None,
+                    'stats': [], 'team_h_difficulty': self.rng.randint(2, 5),
+                    'team_a_difficulty': self.rng.randint(2, 5), 'pulse_id': 115000 + fixture_id,
+                })
+                fixture_id += 1
+        return fixtures
+
+    def _make_player(self, player_id):
+        rng = self.rng
+        minutes = rng.randint(0, 90 * self.current_gw)
+        player = {
+            'chance_of_playing_next_round': None, 'chance_of_playing_this_round': None,
+            'code': 100000 + player_id, 'cost_change_event': 0, 'cost_change_event_fall': 0,
+            'cost_change_start': 0, 'cost_change_start_fall': 0, 'dreamteam_count': rng.randint(0, 3),
+            'element_type': POSITIONS[player_id % 4][0], 'ep_next': f'{rng.uniform(0, 8):.1f}',
+            'ep_this': f'{rng.uniform(0, 8):.1f}', 'event_points': rng.randint(0, 15),
+            'first_name': f'First{player_id}', 'second_name': f'Last{player_id}', 'form': f'{rng.uniform(0, 8):.1f}',
+            'id': player_id, 'in_dreamteam': False, 'news': '', 'news_added': None,
+            'now_cost': rng.randint(40, 150), 'photo': f'{100000 + player_id}.jpg',
+            'points_per_game': f'{rng.uniform(0, 8):.1f}', 'selected_by_percent': f'{rng.uniform(0, 60):.1f}',
+            'special': False, 'squad_number': None, 'status': rng.choice('aaaaaaaadiu'),
+            'team': player_id % self.n_teams + 1, 'team_code': player_id % self.n_teams + 1,
+            'total_points': rng.randint(0, 100), 'transfers_in': rng.randint(0, 10 ** 6),
+            'transfers_in_event': rng.randint(0, 10 ** 5), 'transfers_out': rng.randint(0, 10 ** 6),
+            'transfers_out_event': rng.randint(0, 10 ** 5), 'value_form': '0.5', 'value_season': '10.0',
+            'web_name': f'Player{player_id}', 'minutes': minutes, 'bps': rng.randint(0, 300), 'starts': minutes // 90,
+        }
+        player.update({field: rng.randint(0, 5) for field in STAT_FIELDS})
+        player.update({field: f'{rng.uniform(0, 50):.1f}' for field in DECIMAL_FIELDS})
+        return player
+
+    def bootstrap(self):
+        rng = random.Random(1)
+        teams = [{
+            'code': team_id, 'id': team_id, 'name': f'Team {team_id}', 'short_name': f'T{team_id:02d}',
+            'strength': rng.randint(2, 5), 'strength_overall_away': 1100, 'strength_overall_home': 1150,
+            'strength_attack_away': rng.randint(1050, 1350), 'strength_attack_home': rng.randint(1050, 1350),
+            'strength_defence_away': rng.randint(1050, 1350), 'strength_defence_home': rng.randint(1050, 1350),
+        } for team_id in range(1, self.n_teams + 1)]
+        element_types = [{
+            'id': p[0], 'plural_name': p[1], 'plural_name_short': p[2], 'singular_name': p[3],
+            'singular_name_short': p[2], 'squad_select': p[4], 'squad_min_play': p[5], 'squad_max_play': p[6],
+        } for p in POSITIONS]
+        events = [{
+            'id': gw, 'name': f'Gameweek {gw}', 'deadline_time': kickoff(gw, 10),
+            'highest_score': 120 if gw <= self.current_gw else None, 'average_entry_score': 50,
+            'finished': gw <= self.current_gw, 'is_current': gw == self.current_gw,
+            'is_next': gw == self.current_gw + 1, 'most_selected': 1, 'most_transferred_in': 2, 'top_element': 3,
+            'most_captained': 4, 'most_vice_captained': 5, 'transfers_made': 1000,
+            'chip_plays': [{'chip_name': 'bboost', 'num_played': 1000}, {'chip_name': '3xc', 'num_played': 2000}],
+        } for gw in range(1, 2 * (self.n_teams - 1) + 1)]
+        return {'elements': self.players, 'teams': teams, 'element_types': element_types, 'events': events}
+
+    def summary(self, player_id):
+        if not 1 <= player_id <= self.n_players:
+            return None
+        player = self.players[player_id - 1]
+        rng = random.Random(player_id)
+        history = []
+        for fixture in self.fixtures:
+            if not fixture['started'] or player['team'] not in (fixture['team_h'], fixture['team_a']):
+                continue
+            was_home = fixture['team_h'] == player['team']
+            # Fixtures in play (see play()) give the share of the stats up to the current minute
+            played = fixture['minutes'] / 90
+            row = {
+                'element': player_id, 'fixture': fixture['id'],
+                'opponent_team': fixture['team_a'] if was_home else fixture['team_h'],
+                'total_points': round(rng.randint(0, 12) * played), 'was_home': was_home,
+                'kickoff_time': fixture['kickoff_time'],
+                'team_h_score': fixture['team_h_score'], 'team_a_score': fixture['team_a_score'],
+                'round': fixture['event'], 'minutes': min(rng.choice([0, 45, 90]), fixture['minutes']),
+                'bps': round(rng.randint(0, 40) * played),
+                'starts': 1, 'value': player['now_cost'], 'transfers_balance': 0, 'selected': 1000,
+                'transfers_in': 0, 'transfers_out': 0,
+            }
+            row.update({field: rng.randint(0, 1) for field in STAT_FIELDS})
+            row.update({field: f'{rng.uniform(0, 1):.2f}' for field in DECIMAL_FIELDS})
+            history.append(row)
+        history_past = []
+        for i in range(rng.randint(0, 5)):
+            row = {'season_name': f'{2019 + i}/{20 + i}', 'element_code': player['code'], 'start_cost': 55,
+                   'end_cost': 56, 'total_points': rng.randint(0, 250), 'minutes': rng.randint(0, 3420),
+                   'bps': rng.randint(0, 800), 'starts': rng.randint(0, 38)}
+            row.update({field: rng.randint(0, 10) for field in STAT_FIELDS})
+            row.update({field: f'{rng.uniform(0, 100):.2f}' for field in DECIMAL_FIELDS})
+            history_past.append(row)
+        return {'fixtures': [], 'history': history, 'history_past': history_past}
+
+    def play(self, gameweek, minutes, fixtures=None):
+        """
+        Moves the first `fixtures` fixtures of gameweek (all by default) to `minutes` played;
+        at 90 they are finished. Call StubServer.invalidate() afterwards.
+        """
+        matches = [fixture for fixture in self.fixtures if fixture['event'] == gameweek][:fixtures]
+        for fixture in matches:
+            rng = random.Random(fixture['id'])
+            fixture.update({
+                'started': True, 'minutes': minutes, 'finished': minutes >= 90, 'finished_provisional': minutes >= 90,
+                'team_h_score': rng.randint(0, 3) * minutes // 90, 'team_a_score': rng.randint(0, 3) * minutes // 90,
+            })
+
+    def payload(self, parts):
+        if parts[-1:] == ['bootstrap-static']:
+            return self.bootstrap()
+        if parts[-1:] == ['fixtures']:
+            return self.fixtures
+        if len(parts) >= 2 and parts[-2] == 'element-summary' and parts[-1].isdigit():
+            return self.summary(int(parts[-1]))
+        return None
+
+
+class RecordedAPI:
+    """
+    Serves payloads saved by record(): bootstrap-static.json, fixtures.json and
+    element-summary/<id>.json in one directory.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def payload(self, parts):
+        if parts[-1:] in (['bootstrap-static'], ['fixtures']):
+            path = os.path.join(self.directory, f'{parts[-1]}.json')
+        elif len(parts) >= 2 and parts[-2] == 'element-summary' and parts[-1].isdigit():
+            path = os.path.join(self.directory, 'element-summary', f'{int(parts[-1])}.json')
+        else:
+            return None
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+
+def record(directory, base='https://fantasy.premierleague.com/api', max_players=None):
+    """
+    Function that saves the live API payloads into directory for RecordedAPI.
+    """
+    import requests
+
+    os.makedirs(os.path.join(directory, 'element-summary'), exist_ok=True)
+    bootstrap = requests.get(f'{base}/bootstrap-static/').json()
+    with open(os.path.join(directory, 'bootstrap-static.json'), 'w') as f:
+        json.dump(bootstrap, f)
+    with open(os.path.join(directory, 'fixtures.json'), 'w') as f:
+        json.dump(requests.get(f'{base}/fixtures/').json(), f)
+    for element in bootstrap['elements'][:max_players]:
+        with open(os.path.join(directory, 'element-summary', f"{element['id']}.json"), 'w') as f:
+            json.dump(requests.get(f"{base}/element-summary/{element['id']}/").json(), f)
+
+######################################################
+# stub server
+######################################################
+def endpoint(path):
+    # '/api/element-summary/12/' -> 'element-summary'
+    parts = [p for p in path.split('/') if p and not p.isdigit()]
+    return parts[-1] if parts else ''
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive so pooled sessions can reuse connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?')[0]
+        with server.lock:
+            server.request_count += 1
+            server.endpoint_counts[endpoint(path)] += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        body = server.body(path)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        # Conditional requests: answer 304 when the client already has this version
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        with server.lock:
+            server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, api, latency=0.0, port=0):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.api = api
+        self.latency = latency
+        self.lock = threading.Lock()
+        self._bodies = {}
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.request_count = 0
+        self.bytes_sent = 0
+        self.endpoint_counts = Counter()
+
+    def body(self, path):
+        # Encode each payload once so the server's JSON encoding is not part of the measurement
+        with self.lock:
+            if path not in self._bodies:
+                payload = self.api.payload([p for p in path.split('/') if p])
+                self._bodies[path] = None if payload is None else json.dumps(payload).encode()
+            return self._bodies[path]
+
+    def invalidate(self):
+        """
+        Drops the encoded payloads, e.g. after changing the synthetic data.
+        """
+        with self.lock:
+            self._bodies = {}
+
+
+def start_stub_server(players=660, latency=0.02, port=0, recorded=None, current_gw=10):
+    """
+    Function that starts the stub API on a background thread and returns
+    (server, base_url). Call server.shutdown() when done.
+    """
+    api = RecordedAPI(recorded) if recorded else SyntheticAPI(n_players=players, current_gw=current_gw)
+    server = StubServer(api, latency=latency, port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/api'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=660)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every response')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--current-gw', type=int, default=10)
+    parser.add_argument('--recorded', help='directory with recorded payloads to serve')
+    parser.add_argument('--record', help='save the live API payloads into this directory and exit')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+    server, base = start_stub_server(args.players, args.latency, args.port, args.recorded, args.current_gw)
+    print(f"Serving FPL stand-in on {base} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,138 @@
 import sys
 import os
-import pandas as pd
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'FPL'))
-from Functions import load_fixture, load_fpl, load_player_history
+from Functions import (load_fixture, load_fpl, load_player_history, iter_player_history, get_cache, fetched_fresh,
+                       start_archive, commit_archive, start_replay)
 from Transformation import (transform_fact_history, transform_gameweeks_data, 
                               transform_previous_season, transform_players, 
                               transform_positions, transform_teams)
+from Pipeline import Stage, run_stages
+from Storage import TableWriter, read_table, save_to_parquet, table_exists
+from Dtypes import apply_schema
+from Features import FEATURE_KEYS, ROLLING_COLUMNS, build_player_features
+from Seasons import current_season, save_season, with_element_code
+from Views import render_views
+from Database import save_to_database
+from Instrumentation import instrument, recorder, write_report
+from Incremental import (FACT_KEYS, HISTORY_KEYS, changed_players, load_state,
+                         merge_on_key, save_state)
 
-# Define the function for loading FPL static data
-def load_fpl_data():
-    players_df, teams_df, positions_of_players_df, gameweeks_df = load_fpl()
-    
-    # Transform data
-    transformed_players_df = transform_players(players_df)
-    transformed_teams_df = transform_teams(teams_df)
-    transformed_positions_df = transform_positions(positions_of_players_df)
-    transformed_gameweeks_df = transform_gameweeks_data(gameweeks_df)
+# Number of concurrent element-summary requests and optional global request rate (req/s)
+MAX_WORKERS = int(os.environ.get('FPL_MAX_WORKERS', 8))
+RATE_LIMIT = float(os.environ.get('FPL_RATE_LIMIT', 0)) or None
+
+# Replay mode: rebuild every table from an archived snapshot ('latest' or a snapshot id) without the network
+REPLAY = os.environ.get('FPL_REPLAY')
+
+# Archive the raw API payloads of every run (content-addressed, see FPL/Snapshot.py)
+ARCHIVE = os.environ.get('FPL_ARCHIVE', '1') == '1'
+
+# Streaming mode: player statistics are fetched, transformed and written in batches of
+# FPL_STREAM_BATCH players, so memory stays flat however many players there are
+STREAMING = os.environ.get('FPL_STREAMING', '0') == '1'
+STREAM_BATCH = int(os.environ.get('FPL_STREAM_BATCH', 100))
+
+# Incremental mode: only re-fetch players whose bootstrap-static fields changed since the last run
+# (streaming runs always rebuild the whole tables)
+INCREMENTAL = os.environ.get('FPL_INCREMENTAL', '0') == '1' and not REPLAY and not STREAMING
+STATE_FILE = os.path.join('data', 'player_state.json')
 
-    return transformed_players_df, transformed_teams_df, transformed_positions_df, transformed_gameweeks_df
+# Output format of the tables: 'csv', 'parquet' or 'both'
+OUTPUT_FORMAT = os.environ.get('FPL_OUTPUT_FORMAT', 'csv')
+# Format the pipeline reads its own previous output back from
+READ_FORMAT = 'csv' if OUTPUT_FORMAT == 'csv' else 'parquet'
+
+# Optional SQLite database (e.g. data/fpl.db) that receives every table through upserts
+DATABASE_PATH = os.environ.get('FPL_DATABASE')
+
+# Multi-season mode: also keep this season's per-gameweek tables in data/seasons (see FPL/Seasons.py)
+MULTI_SEASON = os.environ.get('FPL_MULTI_SEASON', '0') == '1'
+
+# Number of pipeline stages allowed to run at the same time
+STAGE_WORKERS = int(os.environ.get('FPL_STAGE_WORKERS', 4))
 
 # Define the function to load player statistics
-def load_player_statistics():
-    players_df, _, _, _ = load_fpl()
-    current_season_df, previous_seasons_df = load_player_history(players_df)
+@instrument
+def load_player_statistics(players_df):
+    existing_fact_df, existing_history_df = None, None
+    if INCREMENTAL:
+        players_df, existing_fact_df, existing_history_df = select_changed_players(players_df)
+        print(f"Incremental mode: fetching {len(players_df)} changed players")
+        if players_df.empty:
+            return existing_fact_df, existing_history_df, []
+
+    # Changed players are revalidated with the server: a cached element-summary within its
+    # TTL can predate the bootstrap-static change that selected them
+    current_season_df, previous_seasons_df = load_player_history(players_df, max_workers=MAX_WORKERS, rate_limit=RATE_LIMIT,
+                                                                 revalidate=INCREMENTAL)
     
     transformed_current_season_df = transform_fact_history(current_season_df)
     transformed_previous_season_df = transform_previous_season(previous_seasons_df)
 
-    return transformed_current_season_df, transformed_previous_season_df
+    # Upsert the fresh rows into the tables of the previous run
+    transformed_current_season_df = merge_on_key(existing_fact_df, transformed_current_season_df, FACT_KEYS, 'element')
+    transformed_previous_season_df = merge_on_key(existing_history_df, transformed_previous_season_df, HISTORY_KEYS, 'element_code')
+    if existing_fact_df is not None:
+        # Categories of the old and new rows differ, so the merged columns are re-typed
+        transformed_current_season_df = apply_schema(transformed_current_season_df, 'Fact_Player')
+        transformed_previous_season_df = apply_schema(transformed_previous_season_df, 'Player_history')
+
+    return transformed_current_season_df, transformed_previous_season_df, players_df['id'].tolist()
 
-def load_fixture_data():
-    fixture_df = load_fixture()
-    return fixture_df
+@instrument
+def stream_player_statistics(players_df):
+    """
+    Streaming version of load_player_statistics: every batch of players is transformed and
+    appended to Fact_Player and Player_history as it arrives. Returns None, later stages
+    read what they need back with statistics_table().
+    """
+    formats = [fmt for fmt in ('csv', 'parquet') if OUTPUT_FORMAT in (fmt, 'both')]
+    fact_writer = TableWriter('Fact_Player', formats)
+    history_writer = TableWriter('Player_history', formats)
+    for current_season_df, previous_seasons_df in iter_player_history(
+            players_df, max_workers=MAX_WORKERS, rate_limit=RATE_LIMIT, batch_size=STREAM_BATCH):
+        if not current_season_df.empty:
+            fact_writer.write(transform_fact_history(current_season_df))
+        if not previous_seasons_df.empty:
+            history_writer.write(transform_previous_season(previous_seasons_df))
+    fact_writer.close()
+    history_writer.close()
+    return None
+
+def statistics_table(stats, table, columns=None):
+    # In streaming mode the player statistics only exist on disk, in the format(s) just written
+    if stats is not None:
+        return stats[0] if table == 'Fact_Player' else stats[1]
+    return read_table(table, columns=columns, file_format=READ_FORMAT)
+
+def select_changed_players(players_df):
+    """
+    Compare players against the state manifest and load the existing tables.
+    Falls back to all players when there is no previous run to merge into.
+    """
+    state = load_state(STATE_FILE)
+    if (state is None or not table_exists('Fact_Player', file_format=READ_FORMAT)
+            or not table_exists('Player_history', file_format=READ_FORMAT)):
+        return players_df, None, None
+
+    existing_fact_df = read_table('Fact_Player', file_format=READ_FORMAT)
+    existing_history_df = read_table('Player_history', file_format=READ_FORMAT)
+    return changed_players(players_df, state), existing_fact_df, existing_history_df
+
+# Feature store: rolling form and per-90 features per player and gameweek
+def load_player_features(fact_df):
+    """
+    Build the feature table; in incremental mode only the gameweeks from the last
+    stored one onwards are recomputed.
+    """
+    existing_df = None
+    if INCREMENTAL and table_exists('Player_features', file_format=READ_FORMAT):
+        existing_df = read_table('Player_features', file_format=READ_FORMAT)
+    return build_player_features(fact_df, existing_df)
 
 # Function to save DataFrame to CSV in the data folder
+@instrument
 def save_to_csv(df, file_name):
     # Ensure the 'data' directory exists
     os.makedirs('data', exist_ok=True)
@@ -44,21 +142,96 @@ def save_to_csv(df, file_name):
     df.to_csv(file_path, index=False)
     print(f"Data saved to CSV file: {file_path}")
 
-# Main function to execute tasks in sequence
+# Function to save a table in the configured output format(s)
+def save_table(df, table):
+    if OUTPUT_FORMAT in ('csv', 'both'):
+        save_to_csv(df, f'{table}.csv')
+    if OUTPUT_FORMAT in ('parquet', 'both'):
+        save_to_parquet(df, table)
+
+# Pipeline stages: each source is fetched exactly once and every stage runs
+# as soon as its dependencies are done, independent stages in parallel
+def build_stages():
+    stages = [
+        # Load
+        Stage('load_fpl', load_fpl),
+        Stage('load_fixture', load_fixture),
+        # Transform (transform_players modifies its input, so it gets its own copy)
+        Stage('players', lambda fpl: transform_players(fpl[0].copy()), ['load_fpl']),
+        Stage('teams', lambda fpl: transform_teams(fpl[1]), ['load_fpl']),
+        Stage('positions', lambda fpl: transform_positions(fpl[2]), ['load_fpl']),
+        Stage('gameweeks', lambda fpl: transform_gameweeks_data(fpl[3]), ['load_fpl']),
+        Stage('player_statistics',
+              lambda fpl: (stream_player_statistics if STREAMING else load_player_statistics)(fpl[0]), ['load_fpl']),
+        Stage('player_features', lambda stats: load_player_features(
+            statistics_table(stats, 'Fact_Player', columns=FEATURE_KEYS + list(ROLLING_COLUMNS))), ['player_statistics']),
+        # Save the transformed DataFrames in the 'data' folder
+        Stage('save_players', lambda df: save_table(df, 'Players'), ['players']),
+        Stage('save_teams', lambda df: save_table(df, 'Teams'), ['teams']),
+        Stage('save_positions', lambda df: save_table(df, 'Positions'), ['positions']),
+        Stage('save_gameweeks', lambda df: save_table(df, 'Gameweeks'), ['gameweeks']),
+        Stage('save_player_features', lambda df: save_table(df, 'Player_features'), ['player_features']),
+        Stage('save_fixtures', lambda df: save_table(df, 'Fixtures'), ['load_fixture']),
+        # Fixture lists and FDR tables for the dashboard, rendered once per run
+        Stage('render_views', render_views, ['load_fixture', 'teams']),
+    ]
+    if not STREAMING:
+        # The streaming stage writes these tables itself
+        stages += [
+            Stage('save_fact_player', lambda stats: save_table(stats[0], 'Fact_Player'), ['player_statistics']),
+            Stage('save_player_history', lambda stats: save_table(stats[1], 'Player_history'), ['player_statistics']),
+        ]
+    if MULTI_SEASON:
+        stages.append(Stage(
+            'save_season',
+            lambda players, gameweeks, stats, fixtures: save_season({
+                'Fact_Player': with_element_code(statistics_table(stats, 'Fact_Player'), players), 'Fixtures': fixtures, 'Gameweeks': gameweeks,
+            }, current_season(gameweeks)),
+            ['players', 'gameweeks', 'player_statistics', 'load_fixture'],
+        ))
+    if DATABASE_PATH:
+        # All tables are loaded in one transaction, so this stage waits for every transform
+        stages.append(Stage(
+            'save_database',
+            lambda players, teams, positions, gameweeks, stats, fixtures: save_to_database({
+                'Players': players, 'Teams': teams, 'Positions': positions, 'Gameweeks': gameweeks,
+                'Fact_Player': statistics_table(stats, 'Fact_Player'),
+                'Player_history': statistics_table(stats, 'Player_history'), 'Fixtures': fixtures,
+            }, DATABASE_PATH),
+            ['players', 'teams', 'positions', 'gameweeks', 'player_statistics', 'load_fixture'],
+        ))
+    return stages
+
+# Main function to execute the pipeline
 def main():
+    recorder.start()
+    if REPLAY:
+        replay = start_replay(REPLAY)
+        print(f"Replaying snapshot {replay.snapshot_id}")
+    elif ARCHIVE:
+        start_archive()
+    results, timings = run_stages(build_stages(), max_workers=STAGE_WORKERS)
+    snapshot_id = replay.snapshot_id if REPLAY else commit_archive()
+    transformed_players = results['players']
+    print("Stage timings: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+
+    # Remember what each player looked like so the next incremental run can skip unchanged ones
+    # Only players whose element-summary was fetched fresh are updated (none when replaying)
+    if not REPLAY:
+        stats = results['player_statistics']
+        fetched = transformed_players['id'].tolist() if stats is None else stats[2]
+        save_state(transformed_players, STATE_FILE, fetched_fresh(fetched))
+
+    # Report how many API calls were served from the response cache
+    cache = get_cache()
+    if cache is not None:
+        print(cache.report())
+
+    # Machine-readable report of this run plus one line in the run history
+    write_report(recorder.report(timings, extra={'cache': cache.stats if cache is not None else None,
+                                                 'snapshot': snapshot_id, 'replay': bool(REPLAY)}))
 
-    transformed_players, transformed_teams, transformed_positions, transformed_gameweeks = load_fpl_data()
-    transformed_current_season, transformed_previous_season = load_player_statistics()
-    fixture_df=load_fixture_data()
-
-    # Save the transformed DataFrames as CSV in the 'data' folder
-    save_to_csv(transformed_players, 'Players.csv')
-    save_to_csv(transformed_teams, 'Teams.csv')
-    save_to_csv(transformed_positions, 'Positions.csv')
-    save_to_csv(transformed_gameweeks, 'Gameweeks.csv')
-    save_to_csv(transformed_current_season, 'Fact_Player.csv')
-    save_to_csv(transformed_previous_season, 'Player_history.csv')
-    save_to_csv(fixture_df, 'Fixtures.csv')
+    return timings
 
 if __name__ == "__main__":
     main()